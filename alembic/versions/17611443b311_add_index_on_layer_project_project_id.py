@@ -0,0 +1,31 @@
+"""add index on layer_project project_id
+
+Revision ID: 17611443b311
+Revises: 49b9ed64d5a7
+Create Date: 2026-10-14 09:12:41.208113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import geoalchemy2
+import sqlmodel
+
+
+
+# revision identifiers, used by Alembic.
+revision = '17611443b311'
+down_revision = '49b9ed64d5a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Layers of a project are always fetched by project_id.
+    # CONCURRENTLY avoids blocking writes but cannot run inside a transaction.
+    with op.get_context().autocommit_block():
+        op.execute('CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_customer_layer_project_project_id ON customer.layer_project (project_id)')
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS customer.ix_customer_layer_project_project_id')
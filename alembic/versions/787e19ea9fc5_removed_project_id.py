@@ -22,14 +22,13 @@ depends_on = None
 def upgrade():
     # ### commands auto generated by Alembic - please adjust! ###
     op.drop_column('job', 'project_id', schema='customer')
-    op.drop_column('layer', 'max_zoom', schema='customer')
-    op.drop_column('layer', 'min_zoom', schema='customer')
+    # Drop both columns in a single ALTER TABLE to take the lock on layer only once
+    op.execute('ALTER TABLE customer.layer DROP COLUMN max_zoom, DROP COLUMN min_zoom')
     # ### end Alembic commands ###
 
 
 def downgrade():
     # ### commands auto generated by Alembic - please adjust! ###
-    op.add_column('layer', sa.Column('min_zoom', sa.INTEGER(), autoincrement=False, nullable=True), schema='customer')
-    op.add_column('layer', sa.Column('max_zoom', sa.INTEGER(), autoincrement=False, nullable=True), schema='customer')
+    op.execute('ALTER TABLE customer.layer ADD COLUMN min_zoom INTEGER, ADD COLUMN max_zoom INTEGER')
     op.add_column('job', sa.Column('project_id', postgresql.UUID(), autoincrement=False, nullable=True), schema='customer')
     # ### end Alembic commands ###
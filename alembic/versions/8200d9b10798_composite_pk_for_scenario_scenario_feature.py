@@ -0,0 +1,48 @@
+"""composite primary key for scenario_scenario_feature
+
+Revision ID: 8200d9b10798
+Revises: 17611443b311
+Create Date: 2026-10-14 10:03:27.581946
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import geoalchemy2
+import sqlmodel
+
+
+
+# revision identifiers, used by Alembic.
+revision = '8200d9b10798'
+down_revision = '17611443b311'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Links missing either side cannot be part of the primary key and point nowhere
+    op.execute(
+        """
+        DELETE FROM customer.scenario_scenario_feature
+        WHERE scenario_id IS NULL OR scenario_feature_id IS NULL
+        """
+    )
+    # Remove duplicated links before the pair becomes the primary key
+    op.execute(
+        """
+        DELETE FROM customer.scenario_scenario_feature a
+        USING customer.scenario_scenario_feature b
+        WHERE a.scenario_id = b.scenario_id
+        AND a.scenario_feature_id = b.scenario_feature_id
+        AND a.id > b.id
+        """
+    )
+    op.drop_constraint('scenario_scenario_feature_pkey', 'scenario_scenario_feature', schema='customer', type_='primary')
+    op.drop_column('scenario_scenario_feature', 'id', schema='customer')
+    op.create_primary_key('scenario_scenario_feature_pkey', 'scenario_scenario_feature', ['scenario_id', 'scenario_feature_id'], schema='customer')
+
+
+def downgrade():
+    op.drop_constraint('scenario_scenario_feature_pkey', 'scenario_scenario_feature', schema='customer', type_='primary')
+    op.add_column('scenario_scenario_feature', sa.Column('id', sa.Integer(), sa.Identity(always=False), nullable=False), schema='customer')
+    op.create_primary_key('scenario_scenario_feature_pkey', 'scenario_scenario_feature', ['id'], schema='customer')
@@ -1,7 +1,7 @@
 """Added column payload to job table
 
 Revision ID: 9956913ab521
-Revises: ce85b51580d3
+Revises: d35bdf597b3b
 Create Date: 2024-09-17 15:05:13.766861
 
 """
@@ -14,7 +14,7 @@ from sqlalchemy.dialects import postgresql
 
 # revision identifiers, used by Alembic.
 revision = '9956913ab521'
-down_revision = 'ce85b51580d3'
+down_revision = 'd35bdf597b3b'
 branch_labels = None
 depends_on = None
 
@@ -0,0 +1,34 @@
+"""add layer listing indexes
+
+Revision ID: 9a1efa529911
+Revises: 8200d9b10798
+Create Date: 2026-10-14 11:20:54.314872
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import geoalchemy2
+import sqlmodel
+
+
+
+# revision identifiers, used by Alembic.
+revision = '9a1efa529911'
+down_revision = '8200d9b10798'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Layer listings filter by owner and type, the catalog by in_catalog and type.
+    # The leading user_id column of the composite index also serves owner-only lookups.
+    # CONCURRENTLY avoids blocking writes but cannot run inside a transaction.
+    with op.get_context().autocommit_block():
+        op.execute('CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_customer_layer_user_id_type ON customer.layer (user_id, type)')
+        op.execute('CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_customer_layer_catalog_type ON customer.layer (type) WHERE in_catalog')
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS customer.ix_customer_layer_catalog_type')
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS customer.ix_customer_layer_user_id_type')
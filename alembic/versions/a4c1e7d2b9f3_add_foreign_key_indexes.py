@@ -0,0 +1,50 @@
+"""add foreign key indexes
+
+Revision ID: a4c1e7d2b9f3
+Revises: 9a1efa529911
+Create Date: 2026-10-14 12:41:07.926415
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import geoalchemy2
+import sqlmodel
+
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4c1e7d2b9f3'
+down_revision = '9a1efa529911'
+branch_labels = None
+depends_on = None
+
+
+# Foreign key columns that are joined on or filtered by without an index.
+# layer.user_id is covered by ix_customer_layer_user_id_type, layer_project.project_id
+# by 17611443b311 and scenario_scenario_feature.scenario_id by the primary key.
+indexes = [
+    ('ix_customer_folder_user_id', 'folder', 'user_id'),
+    ('ix_customer_scenario_user_id', 'scenario', 'user_id'),
+    ('ix_customer_layer_folder_id', 'layer', 'folder_id'),
+    ('ix_customer_layer_data_store_id', 'layer', 'data_store_id'),
+    ('ix_customer_project_user_id', 'project', 'user_id'),
+    ('ix_customer_project_folder_id', 'project', 'folder_id'),
+    ('ix_customer_layer_project_layer_id', 'layer_project', 'layer_id'),
+    ('ix_customer_report_user_id', 'report', 'user_id'),
+    ('ix_customer_report_folder_id', 'report', 'folder_id'),
+    ('ix_customer_report_project_id', 'report', 'project_id'),
+    ('ix_customer_scenario_scenario_feature_scenario_feature_id', 'scenario_scenario_feature', 'scenario_feature_id'),
+]
+
+
+def upgrade():
+    # CONCURRENTLY avoids blocking writes but cannot run inside a transaction.
+    with op.get_context().autocommit_block():
+        for name, table, column in indexes:
+            op.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON customer.{table} ({column})')
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _, _ in reversed(indexes):
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS customer.{name}')
@@ -20,10 +20,9 @@ depends_on = None
 
 
 def upgrade():
-    # ### commands auto generated by Alembic - please adjust! ###
-    op.add_column('scenario_feature', sa.Column('h3_3', sa.Integer(), nullable=False), schema='customer')
-    op.add_column('scenario_feature', sa.Column('h3_6', sa.Integer(), nullable=False), schema='customer')
-    # ### end Alembic commands ###
+    # Nullable columns are added as a pure catalog change without a table rewrite
+    op.add_column('scenario_feature', sa.Column('h3_3', sa.Integer(), nullable=True), schema='customer')
+    op.add_column('scenario_feature', sa.Column('h3_6', sa.Integer(), nullable=True), schema='customer')
 
 
 def downgrade():
@@ -1,19 +1,25 @@
+import asyncio
 import io
-import json
+import os
 import random
-from typing import Dict, List, Union
+import time
+from functools import lru_cache
+from typing import Callable, Dict, List, Union
+from uuid import uuid4
 
 import aiohttp
-import matplotlib.pyplot as plt
+import orjson
 import pandas as pd
+from boto3.s3.transfer import TransferConfig
 from cairosvg import svg2png
-from PIL import Image
+from PIL import Image, ImageDraw, ImageFont
 from pydantic import BaseModel
 from pymgl import Map
 from shapely import from_wkb
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.core.config import settings
+from src.core.config import get_s3_client, settings
 from src.db.models import Project
 from src.db.models.layer import Layer, LayerType
 from src.schemas.layer import FeatureType
@@ -21,24 +27,50 @@ from src.schemas.project import InitialViewState
 from src.utils import async_get_with_retry
 
 
+# Thumbnails are small and uploaded from a worker thread already, so the upload
+# doesn't need its own thread pool
+THUMBNAIL_TRANSFER_CONFIG = TransferConfig(use_threads=False)
+
+# Collections confirmed by geoapi mapped to the time until they are trusted
+COLLECTION_AVAILABLE_TTL = 300
+available_collections: Dict[str, float] = {}
+
+
+@lru_cache(maxsize=None)
+def get_table_font(size: int, bold: bool = False) -> ImageFont.ImageFont:
+    """Load the font used to draw table thumbnails once per size."""
+
+    try:
+        return ImageFont.truetype(
+            "DejaVuSans-Bold.ttf" if bold else "DejaVuSans.ttf", size
+        )
+    except OSError:
+        return ImageFont.load_default()
+
+
+@lru_cache(maxsize=256)
 def rgb_to_hex(rgb: tuple) -> str:
-    return "#{:02x}{:02x}{:02x}".format(rgb[0], rgb[1], rgb[2])
+    return "#" + bytes(rgb[:3]).hex()
+
+
+def get_mapbox_style_single_color(data: Dict, type: str) -> str:
+    rgb = data["properties"].get(type)
+    return rgb_to_hex(tuple(rgb)) if rgb else "#000000"
 
 
 def get_mapbox_style_color(data: Dict, type: str) -> Union[str, List]:
-    colors = data["properties"].get(f"{type}_range", {}).get("colors")
     field_name = data["properties"].get(f"{type}_field", {}).get("name")
+    # Layers styled with a single color don't need the range lookups
+    if not field_name:
+        return get_mapbox_style_single_color(data, type)
+
+    colors = data["properties"].get(f"{type}_range", {}).get("colors")
     color_scale = data["properties"].get(f"{type}_scale")
     color_maps = data["properties"].get(f"{type}_range", {}).get("color_map")
 
     # Assuming fieldType is defined somewhere, similar to the TypeScript version
     field_type = data["properties"].get(f"{type}_field", {}).get("type")
-    if (
-        color_maps
-        and field_name
-        and isinstance(color_maps, list)
-        and color_scale == "ordinal"
-    ):
+    if color_maps and isinstance(color_maps, list) and color_scale == "ordinal":
         values_and_colors = []
         for color_map in color_maps:
             color_map_value = color_map[0]
@@ -71,36 +103,18 @@ def get_mapbox_style_color(data: Dict, type: str) -> Union[str, List]:
 
         return ["match", ["get", field_name]] + values_and_colors + ["#AAAAAA"]
 
-    if (
-        not field_name
-        or not colors
-        or len(data["properties"].get(f"{type}_scale_breaks", {}).get("breaks", []))
-        != len(colors) - 1
-    ):
-        return (
-            rgb_to_hex(data["properties"].get(type))
-            if data["properties"].get(type)
-            else "#000000"
-        )
+    if not colors:
+        return get_mapbox_style_single_color(data, type)
 
-    color_steps = []
-    for index, color in enumerate(colors):
-        if index == len(colors) - 1:
-            color_steps.append([colors[index]])
-        else:
-            color_steps.append(
-                [
-                    color,
-                    data["properties"]
-                    .get(f"{type}_scale_breaks", {})
-                    .get("breaks", [])[index]
-                    or 0,
-                ]
-            )
+    breaks = data["properties"].get(f"{type}_scale_breaks", {}).get("breaks", [])
+    if len(breaks) != len(colors) - 1:
+        return get_mapbox_style_single_color(data, type)
 
-    config = ["step", ["get", field_name]] + [
-        item for sublist in color_steps for item in sublist
-    ]
+    config = ["step", ["get", field_name]]
+    for index, color in enumerate(colors):
+        config.append(color)
+        if index < len(breaks):
+            config.append(breaks[index] or 0)
     return config
 
 
@@ -202,9 +216,35 @@ class PrintMap:
         self.thumbnail_height = 280
         self.thumbnail_width = 674
         self.async_session = async_session
+        # The session must not be used by concurrently rendered thumbnails at once
+        self.session_lock = asyncio.Lock()
 
-    async def add_icons_to_map(self, map: Map, layer: Layer):
-        """Add icons to map."""
+    async def wait_for_collection(
+        self, collection_id: str, session: aiohttp.ClientSession = None
+    ):
+        """Wait until geoapi serves the collection, skipping recently seen ones."""
+
+        if available_collections.get(collection_id, 0) > time.monotonic():
+            return
+
+        header = {"Content-Type": "application/json"}
+        await async_get_with_retry(
+            url=f"{settings.GOAT_GEOAPI_HOST}/collections/" + collection_id,
+            headers=header,
+            num_retries=10,
+            retry_delay=1,
+            session=session,
+        )
+        now = time.monotonic()
+        if len(available_collections) >= 10000:
+            # Drop expired entries to keep the cache bounded
+            for key, expiry in list(available_collections.items()):
+                if expiry <= now:
+                    del available_collections[key]
+        available_collections[collection_id] = now + COLLECTION_AVAILABLE_TTL
+
+    async def get_map_icons(self, layer: Layer) -> List[tuple]:
+        """Fetch the icons of the layer as raw pixel data with their size."""
 
         # Request icon from assets url
         marker_size = layer.properties["marker_size"]
@@ -228,6 +268,7 @@ class PrintMap:
                     }
                 )
 
+        icons = []
         async with aiohttp.ClientSession() as session:
             # for marker in layer.properties.get("marker"):
             for marker in markers:
@@ -257,12 +298,32 @@ class PrintMap:
                         f.write(icon)
                     # # Open the image and get raw pixel data
                     image = Image.open(io.BytesIO(icon))
-                    icon = image.tobytes()
-                    # Add icon to map
-                    map.addImage(icon_name, icon, marker_size, marker_size, 1.0, True)
+                    icons.append((icon_name, image.tobytes(), marker_size))
                 except Exception as e:
                     print(f"Error while adding icon to map: {e}")
-        return map
+        return icons
+
+    def render_map(self, configure: Callable[[Map], None]) -> io.BytesIO:
+        """Create, configure and render a map to a PNG.
+
+        Native maps are bound to the thread that created them, so this runs the
+        whole lifecycle of the map and is meant to be run in a worker thread.
+        """
+
+        map = Map(
+            "mapbox://styles/mapbox/light-v11",
+            provider="mapbox",
+            token=settings.MAPBOX_TOKEN,
+        )
+        map.load()
+        configure(map)
+        try:
+            img_bytes = map.renderPNG()
+        except RuntimeError as e:
+            print("Error while rendering PNG:", e)
+            print("Map state:", map.getState())
+            raise
+        return io.BytesIO(img_bytes)
 
     async def create_layer_thumbnail(self, layer: Layer, file_name: str) -> str:
         """Create layer thumbnail."""
@@ -284,26 +345,39 @@ class PrintMap:
         url = settings.ASSETS_URL + "/" + dir
 
         # Save to s3
-        settings.S3_CLIENT.upload_fileobj(
+        await asyncio.to_thread(
+            get_s3_client().upload_fileobj,
             Fileobj=image,
             Bucket=settings.AWS_S3_ASSETS_BUCKET,
             Key=dir,
             ExtraArgs={"ContentType": "image/png"},
-            Callback=None,
-            Config=None,
+            Config=THUMBNAIL_TRANSFER_CONFIG,
         )
         return url
 
-    async def create_raster_layer_thumbnail(self, layer: Layer) -> io.BytesIO:
-        """Create raster layer thumbnail."""
+    async def create_layer_thumbnails(
+        self, layers: List[Layer]
+    ) -> List[Union[str, BaseException]]:
+        """Create the thumbnails of several layers concurrently.
 
-        # Define map
-        map = Map(
-            "mapbox://styles/mapbox/light-v11",
-            provider="mapbox",
-            token=settings.MAPBOX_TOKEN,
+        The result holds the url or the raised exception for each layer.
+        """
+
+        semaphore = asyncio.Semaphore(os.cpu_count() or 1)
+
+        async def create_thumbnail(layer: Layer) -> str:
+            async with semaphore:
+                return await self.create_layer_thumbnail(
+                    layer=layer,
+                    file_name=str(layer.id) + "_" + str(uuid4()) + ".png",
+                )
+
+        return await asyncio.gather(
+            *[create_thumbnail(layer) for layer in layers], return_exceptions=True
         )
-        map.load()
+
+    async def create_raster_layer_thumbnail(self, layer: Layer) -> io.BytesIO:
+        """Create raster layer thumbnail."""
 
         # Set map extent
         if layer.extent and layer.extent.data:
@@ -313,159 +387,154 @@ class PrintMap:
             # Define global extent
             xmin, ymin, xmax, ymax = -180.0, -90.0, 180.0, 90.0
 
-        map.setBounds(
-            xmin=xmin,
-            ymin=ymin,
-            xmax=xmax,
-            ymax=ymax,
-        )
-        map.setSize(self.thumbnail_width, self.thumbnail_height)
+        def configure(map: Map):
+            map.setBounds(
+                xmin=xmin,
+                ymin=ymin,
+                xmax=xmax,
+                ymax=ymax,
+            )
+            map.setSize(self.thumbnail_width, self.thumbnail_height)
+
+            map.addSource(
+                layer.name,
+                orjson.dumps(
+                    {
+                        "type": "raster",
+                        "tileSize": getattr(layer, "other_properties", {}).get(
+                            "tileSize", 256
+                        ),
+                        "tiles": [layer.url],
+                    }
+                ).decode(),
+            )
+            # Add layer
+            map.addLayer(
+                orjson.dumps(
+                    {
+                        "id": layer.name,
+                        "type": "raster",
+                        "source": layer.name,
+                        "source-layer": "default",
+                        "layout": {
+                            "visibility": "visible",
+                        },
+                        "paint": {
+                            "raster-opacity": layer.properties.get("opacity", 1),
+                        },
+                    }
+                ).decode()
+            )
+
+        # Create and render the map in one worker thread
+        return await asyncio.to_thread(self.render_map, configure)
+
+    def add_feature_layer_to_map(
+        self,
+        map: Map,
+        name: str,
+        collection_id: str,
+        style: dict,
+        with_layout: bool = True,
+    ):
+        """Add the vector tiles of a geoapi collection styled as layer to the map."""
 
         map.addSource(
-            layer.name,
-            json.dumps(
+            name,
+            orjson.dumps(
                 {
-                    "type": "raster",
-                    "tileSize": getattr(layer, "other_properties", {}).get(
-                        "tileSize", 256
-                    ),
-                    "tiles": [layer.url],
-                }
-            ),
-        )
-        # Add layer
-        map.addLayer(
-            json.dumps(
-                {
-                    "id": layer.name,
-                    "type": "raster",
-                    "source": layer.name,
-                    "source-layer": "default",
-                    "layout": {
-                        "visibility": "visible",
-                    },
-                    "paint": {
-                        "raster-opacity": layer.properties.get("opacity", 1),
-                    },
+                    "type": "vector",
+                    "tiles": [
+                        f"{settings.GOAT_GEOAPI_HOST}/collections/{collection_id}"
+                        + "/tiles/{z}/{x}/{y}"
+                    ],
                 }
-            )
+            ).decode(),
         )
-
-        img_bytes = map.renderPNG()
-        image = io.BytesIO(img_bytes)
-        return image
+        layer = {
+            "id": name,
+            "type": style["type"],
+            "source": name,
+            "source-layer": "default",
+            "paint": style["paint"],
+        }
+        if with_layout and style.get("layout"):
+            layer["layout"] = style["layout"]
+        map.addLayer(orjson.dumps(layer).decode())
 
     async def create_feature_layer_thumbnail(self, layer: Layer) -> io.BytesIO:
         """Create feature layer thumbnail."""
 
-        # Define map
-        map = Map(
-            "mapbox://styles/mapbox/light-v11",
-            provider="mapbox",
-            token=settings.MAPBOX_TOKEN,
-        )
-        map.load()
-
-        # Set map extent
+        # Get map extent
         geom_shape = from_wkb(layer.extent.data)
-        map.setBounds(
-            xmin=geom_shape.bounds[0],
-            ymin=geom_shape.bounds[1],
-            xmax=geom_shape.bounds[2],
-            ymax=geom_shape.bounds[3],
-        )
-        map.setSize(self.thumbnail_width, self.thumbnail_height)
 
         # Transform layer to mapbox style
         style = transform_to_mapbox_layer_style_spec(layer.dict())
 
-        # Add icons to map in case of icon style
+        # Fetch icons in case of icon style
+        icons = []
         if style["type"] == "symbol":
-            map = await self.add_icons_to_map(map, layer)
+            icons = await self.get_map_icons(layer)
 
         # Get collection id
         layer_id = layer.id
         collection_id = "user_data." + str(layer_id).replace("-", "")
 
         # Request in recursive loop if layer was already added in geoapi if it does not fail the layer was added
-        header = {"Content-Type": "application/json"}
-        await async_get_with_retry(
-            url=f"{settings.GOAT_GEOAPI_HOST}/collections/" + collection_id,
-            headers=header,
-            num_retries=10,
-            retry_delay=1,
-        )
-
-        # Add layer source
-        tile_url = (
-            f"{settings.GOAT_GEOAPI_HOST}/collections/"
-            + collection_id
-            + "/tiles/{z}/{x}/{y}"
-        )
-        map.addSource(
-            layer.name,
-            json.dumps(
-                {
-                    "type": "vector",
-                    "tiles": [tile_url],
-                }
-            ),
-        )
-        # Add layer
-        layer = {
-            "id": layer.name,
-            "type": style["type"],
-            "source": layer.name,
-            "source-layer": "default",
-            "paint": style["paint"],
-        }
-        if style.get("layout"):
-            layer["layout"] = style["layout"]
+        await self.wait_for_collection(collection_id)
+
+        def configure(map: Map):
+            map.setBounds(
+                xmin=geom_shape.bounds[0],
+                ymin=geom_shape.bounds[1],
+                xmax=geom_shape.bounds[2],
+                ymax=geom_shape.bounds[3],
+            )
+            map.setSize(self.thumbnail_width, self.thumbnail_height)
 
-        map.addLayer(json.dumps(layer))
+            # Add icons to map
+            for icon_name, icon, size in icons:
+                map.addImage(icon_name, icon, size, size, 1.0, True)
 
-        img_bytes = map.renderPNG()
-        image = io.BytesIO(img_bytes)
+            # Add layer source and layer
+            self.add_feature_layer_to_map(map, layer.name, collection_id, style)
 
-        return image
+        # Create and render the map in one worker thread
+        return await asyncio.to_thread(self.render_map, configure)
 
     async def create_table_thumbnail(self, layer: Layer):
         """Create table thumbnail."""
 
         # Get the first 4 four columns of the attribute mapping.
-        columns = []
-        columns_mapped = []
-        mixed_items = list(layer.attribute_mapping.items())
-        random.shuffle(mixed_items)
-        index = 0
-        for key, value in mixed_items:
-            index += 1
-            if index < 5:
-                columns.append(key)
-                # Limit columns name to 5 chars and add ...
-                if len(value) > 6:
-                    value = value[:6] + "..."
-                columns_mapped.append(value)
-
-        # Read four rows of the table and create a DataFrame
-        data = await self.async_session.execute(
-            f"""
-            SELECT {', '.join(columns[:4])}
-            FROM {layer.table_name}
-            LIMIT 4
-            """
+        items = list(layer.attribute_mapping.items())
+        picked = random.sample(items, k=min(4, len(items)))
+        columns = [key for key, _ in picked]
+        # Limit columns name to 6 chars and add ...
+        columns_mapped = [
+            value[:6] + "..." if len(value) > 6 else value for _, value in picked
+        ]
+
+        # Read four rows of the table limiting the content of each cell to 15 chars
+        select_expr = ", ".join(
+            f"CASE WHEN length({column}::text) > 15 "
+            f"THEN left({column}::text, 15) || '...' ELSE {column}::text END"
+            for column in columns
         )
-        data = data.all()
+        async with self.session_lock:
+            data = await self.async_session.execute(
+                text(
+                    f"""
+                    SELECT {select_expr}
+                    FROM {layer.table_name}
+                    LIMIT 4
+                    """
+                )
+            )
+            data = data.all()
         # Add an empty row at end of each row
         data = [list(row) for row in data]
         data.append(["..."] * len(columns_mapped[:4]))
 
-        # Limit the length of the content of each cell to 15 chars and add ...
-        for row in data:
-            for index, cell in enumerate(row):
-                if len(str(cell)) > 15:
-                    row[index] = str(cell)[:15] + "..."
-
         # Create a DataFrame
         df = pd.DataFrame(data, columns=columns_mapped[:4])
 
@@ -473,40 +542,38 @@ class PrintMap:
         if len(columns_mapped) > 4:
             df["... "] = "..."
 
-        # Create a figure and an axes
-        fig, ax = plt.subplots(
-            figsize=(self.thumbnail_width / 80, self.thumbnail_height / 80)
-        )  # Convert pixels to inches
-
-        # Remove the axes
-        ax.axis("off")
-
-        # Create a table and add it to the axes
-        table = plt.table(
-            cellText=df.values,
-            colLabels=df.columns,
-            loc="center",
-            cellLoc="center",
-            colWidths=[1] * len(df.columns),  # Make columns of equal size
-            bbox=[0, 0, 1, 1],  # Full height and width with a small padding
-        )
-        table.auto_set_font_size(False)
-        table.set_fontsize(12)
-
-        # Set the color, font weight, and font color of the header cells
-        table_props = table.properties()
-        table_cells = table_props["children"]
-        color = "#535353"
-        for cell in table_cells:
-            if cell.get_text().get_text() in df.columns:
-                cell.set_facecolor(color)
-                cell.get_text().set_fontsize(16)
-                cell.get_text().set_weight("bold")  # Make the text bold
-                cell.get_text().set_color("white")  # Set the font color to white
+        # Draw the table on a blank image
+        rows = [list(df.columns)] + df.values.tolist()
+        col_width = self.thumbnail_width // len(rows[0])
+        row_height = self.thumbnail_height // len(rows)
+        img = Image.new("RGB", (self.thumbnail_width, self.thumbnail_height), "white")
+        draw = ImageDraw.Draw(img)
+        for row_index, row in enumerate(rows):
+            is_header = row_index == 0
+            font = get_table_font(16 if is_header else 12, bold=is_header)
+            for col_index, cell in enumerate(row):
+                x0, y0 = col_index * col_width, row_index * row_height
+                draw.rectangle(
+                    (x0, y0, x0 + col_width, y0 + row_height),
+                    fill="#535353" if is_header else "white",
+                    outline="black",
+                )
+                # Center the text in the cell
+                cell_text = str(cell)
+                left, top, right, bottom = draw.textbbox((0, 0), cell_text, font=font)
+                draw.text(
+                    (
+                        x0 + (col_width - (right - left)) / 2,
+                        y0 + (row_height - (bottom - top)) / 2,
+                    ),
+                    cell_text,
+                    fill="white" if is_header else "black",
+                    font=font,
+                )
 
         # Save the file as bytes and return it
         image = io.BytesIO()
-        fig.savefig(image, bbox_inches="tight", pad_inches=1)
+        img.save(image, "PNG", optimize=True)
         image.seek(0)
         return image
 
@@ -517,130 +584,105 @@ class PrintMap:
         layers_project: [BaseModel],
         file_name: str,
     ):
-        # Define map
-        map = Map(
-            "mapbox://styles/mapbox/light-v11",
-            provider="mapbox",
-            token=settings.MAPBOX_TOKEN,
-        )
-        map.load()
-
-        # Set map extent
-        map.setCenter(initial_view_state["longitude"], initial_view_state["latitude"])
-        map.setZoom(initial_view_state["zoom"])
-        map.setSize(self.thumbnail_width, self.thumbnail_height)
-
         # Sort layer_project by layer order
         if len(layers_project) > 1:
-            layers_project.sort(
-                key=lambda x: project.layer_order.index(x.id), reverse=True
-            )
+            layer_order = {id: index for index, id in enumerate(project.layer_order)}
+            layers_project.sort(key=lambda x: layer_order[x.id], reverse=True)
 
-        for layer in layers_project:
-            if (
-                layer.properties["visibility"] is False
-                or layer.properties["visibility"] is None
-            ):
-                continue
+        layers_project = [
+            layer
+            for layer in layers_project
+            if layer.properties["visibility"] is not False
+            and layer.properties["visibility"] is not None
+        ]
 
-            if (
-                layer.type == LayerType.feature
-                and layer.feature_layer_type != FeatureType.street_network
-            ):
-                # Get collection id
-                layer_id = layer.layer_id
-                collection_id = "user_data." + str(layer_id).replace("-", "")
-
-                # Request in recursive loop if layer was already added in geoapi if it does not fail the layer was added
-                header = {"Content-Type": "application/json"}
-                await async_get_with_retry(
-                    url=f"{settings.GOAT_GEOAPI_HOST}/collections/" + collection_id,
-                    headers=header,
-                    num_retries=10,
-                    retry_delay=1,
-                )
-
-                # Transform style
-                style = transform_to_mapbox_layer_style_spec(layer.dict())
+        # Wait concurrently until all feature layers were added in geoapi
+        async with aiohttp.ClientSession() as session:
+            await asyncio.gather(
+                *[
+                    self.wait_for_collection(
+                        "user_data." + str(layer.layer_id).replace("-", ""),
+                        session=session,
+                    )
+                    for layer in layers_project
+                    if layer.type == LayerType.feature
+                    and layer.feature_layer_type != FeatureType.street_network
+                ]
+            )
 
-                # Add layer source
-                tile_url = (
-                    f"{settings.GOAT_GEOAPI_HOST}/collections/"
-                    + collection_id
-                    + "/tiles/{z}/{x}/{y}"
-                )
-                map.addSource(
-                    layer.name,
-                    json.dumps(
-                        {
-                            "type": "vector",
-                            "tiles": [tile_url],
-                        }
-                    ),
-                )
-                # Add layer
-                map.addLayer(
-                    json.dumps(
-                        {
-                            "id": layer.name,
-                            "type": style["type"],
-                            "source": layer.name,
-                            "source-layer": "default",
-                            "paint": style["paint"],
-                        }
+        def configure(map: Map):
+            # Set map extent
+            map.setCenter(
+                initial_view_state["longitude"], initial_view_state["latitude"]
+            )
+            map.setZoom(initial_view_state["zoom"])
+            map.setSize(self.thumbnail_width, self.thumbnail_height)
+
+            # Add the layers in order, as the map is not safe for concurrent use
+            for layer in layers_project:
+                if (
+                    layer.type == LayerType.feature
+                    and layer.feature_layer_type != FeatureType.street_network
+                ):
+                    # Get collection id
+                    layer_id = layer.layer_id
+                    collection_id = "user_data." + str(layer_id).replace("-", "")
+
+                    # Transform style
+                    style = transform_to_mapbox_layer_style_spec(layer.dict())
+
+                    # Add layer source and layer, icons are not loaded for projects
+                    self.add_feature_layer_to_map(
+                        map, layer.name, collection_id, style, with_layout=False
                     )
-                )
-            elif layer.type == LayerType.raster:
-                # Add raster layer source
-                map.addSource(
-                    layer.name,
-                    json.dumps(
-                        {
-                            "type": "raster",
-                            "tileSize": getattr(layer, "other_properties", {}).get(
-                                "tileSize", 256
-                            ),
-                            "tiles": [layer.url],
-                        }
-                    ),
-                )
-                # Add raster layer
-                map.addLayer(
-                    json.dumps(
-                        {
-                            "id": layer.name,
-                            "type": "raster",
-                            "source": layer.name,
-                            "source-layer": "default",
-                            "layout": {
-                                "visibility": "visible",
-                            },
-                            "paint": {
-                                "raster-opacity": layer.properties.get("opacity", 1),
-                            },
-                        }
+                elif layer.type == LayerType.raster:
+                    # Add raster layer source
+                    map.addSource(
+                        layer.name,
+                        orjson.dumps(
+                            {
+                                "type": "raster",
+                                "tileSize": getattr(layer, "other_properties", {}).get(
+                                    "tileSize", 256
+                                ),
+                                "tiles": [layer.url],
+                            }
+                        ).decode(),
                     )
-                )
-        # img_bytes = map.renderPNG()
-        try:
-            img_bytes = map.renderPNG()
-        except RuntimeError as e:
-            print("Error while rendering PNG:", e)
-            print("Map state:", map.getState())
-            raise
-        image = io.BytesIO(img_bytes)
+                    # Add raster layer
+                    map.addLayer(
+                        orjson.dumps(
+                            {
+                                "id": layer.name,
+                                "type": "raster",
+                                "source": layer.name,
+                                "source-layer": "default",
+                                "layout": {
+                                    "visibility": "visible",
+                                },
+                                "paint": {
+                                    "raster-opacity": layer.properties.get(
+                                        "opacity", 1
+                                    ),
+                                },
+                            }
+                        ).decode()
+                    )
+
+        # Create and render the map in one worker thread
+        image = await asyncio.to_thread(self.render_map, configure)
 
         # Save image to s3 bucket using s3 client from settings
         dir = settings.THUMBNAIL_DIR_PROJECT + "/" + file_name
         url = settings.ASSETS_URL + "/" + dir
 
         # Save to s3
-        settings.S3_CLIENT.upload_fileobj(
+        await asyncio.to_thread(
+            get_s3_client().upload_fileobj,
             Fileobj=image,
             Bucket=settings.AWS_S3_ASSETS_BUCKET,
             Key=dir,
             ExtraArgs={"ContentType": "image/png"},
-            Callback=None,
-            Config=None,
+            Config=THUMBNAIL_TRANSFER_CONFIG,
         )
         return url
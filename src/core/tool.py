@@ -317,10 +317,7 @@ class CRUDToolBase(CRUDFailedJob):
         )
 
         # Get extent, size and properties
-        layer.size = await crud_layer.get_feature_layer_size(
-            async_session=self.async_session, layer=layer
-        )
-        layer.extent = await crud_layer.get_feature_layer_extent(
+        layer.size, layer.extent = await crud_layer.get_feature_layer_size_extent(
             async_session=self.async_session, layer=layer
         )
         # Raise error if extent or size is None
@@ -2,6 +2,7 @@ import asyncio
 from uuid import UUID
 
 from httpx import AsyncClient
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.config import settings
@@ -125,48 +126,50 @@ class CRUDCatchmentAreaBase(CRUDToolBase):
             job_id=self.job_id,
         )
 
-        # Check if starting points are within the geofence
-        for i in range(0, len(params.starting_points.latitude), 500):
-            # Create insert query
-            lats = params.starting_points.latitude[i : i + 500]
-            lons = params.starting_points.longitude[i : i + 500]
-            sql = f"""
-                WITH to_test AS
-                (
-                    SELECT ST_SETSRID(ST_MAKEPOINT(lon[gs], lat[gs]), 4326) AS geom
-                    FROM generate_series(1, array_length(ARRAY{str(lats)}, 1)) AS gs,
-                    LATERAL (SELECT ARRAY{str(lats)} AS lat, ARRAY{str(lons)} AS lon) AS arrays
-                )
-                SELECT COUNT(*)
+        # Check if starting points are within the geofence and save them into the
+        # user data table in one statement, nothing is inserted if the check fails
+        sql = text(
+            f"""
+            WITH to_test AS
+            (
+                SELECT ST_SETSRID(ST_MAKEPOINT(lon, lat), 4326) AS geom
+                FROM UNNEST(CAST(:lats AS float8[]), CAST(:lons AS float8[])) AS points(lat, lon)
+            ),
+            not_intersecting AS
+            (
+                SELECT COUNT(*) AS cnt
                 FROM to_test t
                 WHERE NOT EXISTS (
                     SELECT 1
                     FROM {params.geofence_table} AS g
                     WHERE ST_INTERSECTS(t.geom, g.geom)
                 )
-            """
-            # Execute query
-            cnt_not_intersecting = await self.async_session.execute(sql)
-            cnt_not_intersecting = cnt_not_intersecting.scalars().first()
-
-            if cnt_not_intersecting > 0:
-                raise OutOfGeofenceError(
-                    f"There are {cnt_not_intersecting} starting points that are not within the geofence. Please check your starting points."
-                )
-
-        # Save data into user data tables in batches of 500
-        for i in range(0, len(params.starting_points.latitude), 500):
-            # Create insert query
-            lats = params.starting_points.latitude[i : i + 500]
-            lons = params.starting_points.longitude[i : i + 500]
-            sql = f"""
+            ),
+            inserted AS
+            (
                 INSERT INTO {self.table_starting_points} (layer_id, geom)
-                SELECT '{layer.id}', ST_SETSRID(ST_MAKEPOINT(lon[gs], lat[gs]), 4326) AS geom
-                FROM generate_series(1, array_length(ARRAY{str(lats)}, 1)) AS gs,
-                LATERAL (SELECT ARRAY{str(lats)} AS lat, ARRAY{str(lons)} AS lon) AS arrays
-            """
-            # Execute query
-            await self.async_session.execute(sql)
+                SELECT CAST(:layer_id AS uuid), geom
+                FROM to_test
+                WHERE (SELECT cnt FROM not_intersecting) = 0
+            )
+            SELECT cnt FROM not_intersecting
+        """
+        )
+        # Execute query
+        cnt_not_intersecting = await self.async_session.execute(
+            sql,
+            {
+                "lats": [float(lat) for lat in params.starting_points.latitude],
+                "lons": [float(lon) for lon in params.starting_points.longitude],
+                "layer_id": layer.id,
+            },
+        )
+        cnt_not_intersecting = cnt_not_intersecting.scalars().first()
+
+        if cnt_not_intersecting > 0:
+            raise OutOfGeofenceError(
+                f"There are {cnt_not_intersecting} starting points that are not within the geofence. Please check your starting points."
+            )
 
         return layer
 
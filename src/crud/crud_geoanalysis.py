@@ -1,4 +1,8 @@
+import asyncio
+from typing import Dict, List
+
 from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.chart import Chart
 from src.core.config import settings
@@ -24,6 +28,10 @@ from src.utils import (
 )
 
 
+# Average edge length of h3 cells in meters per resolution, as reported by h3-pg
+h3_avg_edge_lengths: Dict[int, float] = {}
+
+
 class CRUDAggregateBase(CRUDToolBase, Chart):
     def __init__(self, job_id, background_tasks, async_session, user_id, project_id):
         super().__init__(job_id, background_tasks, async_session, user_id, project_id)
@@ -43,6 +51,10 @@ class CRUDAggregateBase(CRUDToolBase, Chart):
         )
         source_layer_project = layers_project["source_layer_project_id"]
         aggregation_layer_project = layers_project.get("aggregation_layer_project_id")
+        temp_aggregation = None
+        select_columns = None
+        group_by_columns = None
+        group_column_name = None
 
         # Check if mapped statistics field is float, integer or biginteger
         result_check_statistics_field = await self.check_column_statistics(
@@ -139,8 +151,8 @@ class CRUDAggregateBase(CRUDToolBase, Chart):
         )
         insert_columns = ", ".join(insert_columns_arr)
 
-        # Create new layer
-        layer_in = IFeatureLayerToolCreate(
+        # Create new layer, all fields were derived from validated input already
+        layer_in = IFeatureLayerToolCreate.construct(
             name=DefaultResultLayerName[params.tool_type].value,
             feature_layer_geometry_type=FeatureGeometryType.polygon,
             attribute_mapping={**attribute_mapping_aggregation, **result_column},
@@ -149,21 +161,120 @@ class CRUDAggregateBase(CRUDToolBase, Chart):
         )
 
         return {
-            "aggregation_layer_project": locals().get(
-                "aggregation_layer_project", None
-            ),
+            "aggregation_layer_project": aggregation_layer_project,
             "layer_in": layer_in,
             "temp_source": temp_source,
-            "temp_aggregation": locals().get("temp_aggregation", None),
-            "group_by_columns": locals().get("group_by_columns", None),
-            "group_column_name": locals().get("group_column_name", None),
+            "temp_aggregation": temp_aggregation,
+            "group_by_columns": group_by_columns,
+            "group_column_name": group_column_name,
             "statistics_column_query": statistics_column_query,
             "insert_columns": insert_columns,
-            "select_columns": locals().get("select_columns", None),
+            "select_columns": select_columns,
             "result_check_statistics_field": result_check_statistics_field,
             "mapped_statistics_field": mapped_statistics_field,
         }
 
+    async def execute_concurrently(self, queries: List[List[str]]):
+        """Execute independent lists of queries on separate connections."""
+
+        if len(queries) == 1:
+            for query in queries[0]:
+                await self.async_session.execute(query)
+            return
+
+        # Commit first so that the other connections see the created tables
+        await self.async_session.commit()
+
+        async def execute(queries: List[str]):
+            async with AsyncSession(self.async_session.bind) as async_session:
+                for query in queries:
+                    await async_session.execute(query)
+                await async_session.commit()
+
+        await asyncio.gather(*[execute(query_list) for query_list in queries])
+
+    def build_aggregation_layer_queries(
+        self, aggregation: dict, params, statistics_column_query: str
+    ):
+        """Build the stats and combine queries for aggregating on a layer."""
+
+        aggregation_layer_project = aggregation["aggregation_layer_project"]
+        layer_in = aggregation["layer_in"]
+        temp_source = aggregation["temp_source"]
+        temp_aggregation = aggregation["temp_aggregation"]
+        group_by_columns = aggregation["group_by_columns"]
+        group_column_name = aggregation["group_column_name"]
+        insert_columns = aggregation["insert_columns"]
+        select_columns = aggregation["select_columns"]
+
+        # Define subquery for grouped by id only
+        sql_query_total_stats = f"""
+            CREATE UNLOGGED TABLE {self.table_name_total_stats} AS
+            SELECT {temp_aggregation}.id, {statistics_column_query} AS stats
+            FROM {temp_aggregation}
+            JOIN {temp_source}
+            ON {temp_aggregation}.h3_3 = {temp_source}.h3_3
+            AND ST_Intersects({temp_aggregation}.geom, {temp_source}.geom)
+            GROUP BY {temp_aggregation}.id
+        """
+        # Total and grouped stats don't depend on each other
+        stats_queries = [
+            [
+                sql_query_total_stats,
+                f"CREATE INDEX ON {self.table_name_total_stats} (id);",
+            ]
+        ]
+
+        if params.source_group_by_field:
+            # Define subquery for grouped by id and group_by_field
+            sql_query_group_stats = f"""
+                CREATE UNLOGGED TABLE {self.table_name_grouped_stats} AS
+                SELECT id, JSONB_OBJECT_AGG(group_column_name, stats) AS stats
+                FROM
+                (
+                    SELECT {temp_aggregation}.id, {group_column_name}, {statistics_column_query} AS stats
+                    FROM {temp_aggregation}
+                    JOIN {temp_source}
+                    ON {temp_aggregation}.h3_3 = {temp_source}.h3_3
+                    AND ST_Intersects({temp_aggregation}.geom, {temp_source}.geom)
+                    GROUP BY {temp_aggregation}.id, {group_by_columns}
+                ) AS to_group
+                GROUP BY id
+            """
+            stats_queries.append(
+                [
+                    text(sql_query_group_stats),
+                    f"CREATE INDEX ON {self.table_name_grouped_stats} (id);",
+                ]
+            )
+
+            # Build combined query with two left joins
+            sql_query_combine = f"""
+                INSERT INTO {self.result_table} (layer_id, {insert_columns})
+                WITH first_join AS
+                (
+                    SELECT t.id, t.stats AS total_stats, g.stats AS grouped_stats
+                    FROM {self.table_name_grouped_stats} g, {self.table_name_total_stats} t
+                    WHERE g.id = t.id
+                )
+                SELECT '{layer_in.id}', {select_columns}, f.total_stats, f.grouped_stats
+                FROM {aggregation_layer_project.table_name}
+                LEFT JOIN first_join f
+                ON {aggregation_layer_project.table_name}.id = f.id
+                WHERE {aggregation_layer_project.where_query}
+            """
+        else:
+            # Build combined query with one left join
+            sql_query_combine = f"""
+                INSERT INTO {self.result_table} (layer_id, {insert_columns})
+                SELECT '{layer_in.id}', {select_columns}, t.stats AS total_stats
+                FROM {aggregation_layer_project.table_name}
+                LEFT JOIN {self.table_name_total_stats} t
+                ON {aggregation_layer_project.table_name}.id = t.id
+                WHERE {aggregation_layer_project.where_query}
+            """
+        return stats_queries, sql_query_combine
+
     async def create_chart_aggregation(
         self, aggregation_layer_project, layer, layer_project, params
     ):
@@ -206,103 +317,52 @@ class CRUDAggregatePoint(CRUDAggregateBase):
         aggregation_layer_project = aggregation["aggregation_layer_project"]
         layer_in = aggregation["layer_in"]
         temp_source = aggregation["temp_source"]
-        temp_aggregation = aggregation["temp_aggregation"]
         group_by_columns = aggregation["group_by_columns"]
         group_column_name = aggregation["group_column_name"]
         statistics_column_query = aggregation["statistics_column_query"]
         insert_columns = aggregation["insert_columns"]
-        select_columns = aggregation["select_columns"]
 
         # Create query
         if aggregation_layer_project:
-            # Define subquery for grouped by id only
-            sql_query_total_stats = f"""
-                CREATE TABLE {self.table_name_total_stats} AS
-                SELECT {temp_aggregation}.id, {statistics_column_query} AS stats
-                FROM {temp_aggregation}, {temp_source}
-                WHERE ST_Intersects({temp_aggregation}.geom, {temp_source}.geom)
-                AND {temp_aggregation}.h3_3 = {temp_source}.h3_3
-                GROUP BY {temp_aggregation}.id
-            """
-            await self.async_session.execute(sql_query_total_stats)
-            await self.async_session.execute(
-                f"CREATE INDEX ON {self.table_name_total_stats} (id);"
+            stats_queries, sql_query = self.build_aggregation_layer_queries(
+                aggregation=aggregation,
+                params=params,
+                statistics_column_query=statistics_column_query,
             )
-
-            if params.source_group_by_field:
-                # Define subquery for grouped by id and group_by_field
-                sql_query_group_stats = f"""
-                    CREATE TABLE {self.table_name_grouped_stats} AS
-                    SELECT id, JSONB_OBJECT_AGG(group_column_name, stats) AS stats
-                    FROM
-                    (
-                        SELECT {temp_aggregation}.id, {group_column_name}, {statistics_column_query} AS stats
-                        FROM {temp_aggregation}, {temp_source}
-                        WHERE ST_Intersects({temp_aggregation}.geom, {temp_source}.geom)
-                        AND {temp_aggregation}.h3_3 = {temp_source}.h3_3
-                        GROUP BY {temp_aggregation}.id, {group_by_columns}
-                    ) AS to_group
-                    GROUP BY id
-                """
-                await self.async_session.execute(text(sql_query_group_stats))
-                await self.async_session.execute(
-                    f"CREATE INDEX ON {self.table_name_grouped_stats} (id);"
-                )
-
-                # Build combined query with two left joins
-                sql_query = f"""
-                    INSERT INTO {self.result_table} (layer_id, {insert_columns})
-                    WITH first_join AS
-                    (
-                        SELECT t.id, t.stats AS total_stats, g.stats AS grouped_stats
-                        FROM {self.table_name_grouped_stats} g, {self.table_name_total_stats} t
-                        WHERE g.id = t.id
-                    )
-                    SELECT '{layer_in.id}', {select_columns}, f.total_stats, f.grouped_stats
-                    FROM {aggregation_layer_project.table_name}
-                    LEFT JOIN first_join f
-                    ON {aggregation_layer_project.table_name}.id = f.id
-                    WHERE {aggregation_layer_project.where_query}
-                """
-            else:
-                # Build combined query with one left join
-                sql_query = f"""
-                    INSERT INTO {self.result_table} (layer_id, {insert_columns})
-                    SELECT '{layer_in.id}', {select_columns}, t.stats AS total_stats
-                    FROM {aggregation_layer_project.table_name}
-                    LEFT JOIN {self.table_name_total_stats} t
-                    ON {aggregation_layer_project.table_name}.id = t.id
-                    WHERE {aggregation_layer_project.where_query}
-                """
         else:
             # If aggregation_layer_project_id does not exist the h3 grid will be taken for the intersection
             sql_query_total_stats = f"""
-                CREATE TABLE {self.table_name_total_stats} AS
+                CREATE UNLOGGED TABLE {self.table_name_total_stats} AS
                 SELECT h3_lat_lng_to_cell(geom::point, {params.h3_resolution}) h3_index, {statistics_column_query} AS stats
                 FROM {temp_source}
-                GROUP BY h3_lat_lng_to_cell(geom::point, {params.h3_resolution})
+                GROUP BY h3_index
             """
-            await self.async_session.execute(sql_query_total_stats)
-            await self.async_session.execute(
-                f"CREATE INDEX ON {self.table_name_total_stats} (h3_index);"
-            )
+            # Total and grouped stats don't depend on each other
+            stats_queries = [
+                [
+                    sql_query_total_stats,
+                    f"CREATE INDEX ON {self.table_name_total_stats} (h3_index);",
+                ]
+            ]
 
             if params.source_group_by_field:
                 # Define subquery for grouped by id and group_by_field
                 sql_query_group_stats = f"""
-                    CREATE TABLE {self.table_name_grouped_stats} AS
+                    CREATE UNLOGGED TABLE {self.table_name_grouped_stats} AS
                     SELECT h3_index, JSONB_OBJECT_AGG(group_column_name, stats) AS stats
                     FROM
                     (
                         SELECT h3_lat_lng_to_cell(geom::point, {params.h3_resolution}) h3_index, {group_column_name}, {statistics_column_query} AS stats
                         FROM {temp_source}
-                        GROUP BY h3_lat_lng_to_cell(geom::point, {params.h3_resolution}), {group_by_columns}
+                        GROUP BY h3_index, {group_by_columns}
                     ) AS to_group
                     GROUP BY h3_index
                 """
-                await self.async_session.execute(sql_query_group_stats)
-                await self.async_session.execute(
-                    f"CREATE INDEX ON {self.table_name_grouped_stats} (h3_index);"
+                stats_queries.append(
+                    [
+                        sql_query_group_stats,
+                        f"CREATE INDEX ON {self.table_name_grouped_stats} (h3_index);",
+                    ]
                 )
 
                 sql_query = f"""
@@ -320,6 +380,7 @@ class CRUDAggregatePoint(CRUDAggregateBase):
                     FROM {self.table_name_total_stats} t
                 """
         # Execute query
+        await self.execute_concurrently(stats_queries)
         await self.async_session.execute(sql_query)
 
         # Create new layer
@@ -374,85 +435,37 @@ class CRUDAggregatePolygon(CRUDAggregateBase):
         group_column_name = aggregation["group_column_name"]
         statistics_column_query = aggregation["statistics_column_query"]
         insert_columns = aggregation["insert_columns"]
-        select_columns = aggregation["select_columns"]
         mapped_statistics_field = aggregation["result_check_statistics_field"][
             "mapped_statistics_field"
         ]
         if aggregation_layer_project:
             if params.weigthed_by_intersecting_area:
-                statistics_column_query = f"{statistics_column_query} * SUM(ST_AREA(ST_INTERSECTION({temp_aggregation}.geom, {temp_source}.geom)) / ST_AREA({temp_source}.geom))"
-
-            # Define subquery for grouped by id only
-            sql_query_total_stats = f"""
-                CREATE TABLE {self.table_name_total_stats} AS
-                SELECT {temp_aggregation}.id, round(({statistics_column_query})::numeric, 6) AS stats
-                FROM {temp_aggregation}, {temp_source}
-                WHERE ST_Intersects({temp_aggregation}.geom, {temp_source}.geom)
-                AND {temp_aggregation}.h3_3 = {temp_source}.h3_3
-                GROUP BY {temp_aggregation}.id
-            """
-            await self.async_session.execute(sql_query_total_stats)
-            await self.async_session.execute(
-                f"CREATE INDEX ON {self.table_name_total_stats} (id);"
+                # Avoid computing the intersection for fully covered polygons
+                statistics_column_query = f"""{statistics_column_query} * SUM(
+                    CASE WHEN ST_CoveredBy({temp_source}.geom, {temp_aggregation}.geom) THEN 1
+                    ELSE ST_AREA(ST_INTERSECTION({temp_aggregation}.geom, {temp_source}.geom)) / ST_AREA({temp_source}.geom)
+                    END)"""
+
+            stats_queries, sql_query_combine = self.build_aggregation_layer_queries(
+                aggregation=aggregation,
+                params=params,
+                statistics_column_query=(
+                    f"round(({statistics_column_query})::numeric, 6)"
+                ),
             )
-
-            if params.source_group_by_field:
-                # Define subquery for grouped by id and group_by_field
-
-                sql_query_group_stats = f"""
-                    CREATE TABLE {self.table_name_grouped_stats} AS
-                    SELECT id, JSONB_OBJECT_AGG(group_column_name, stats) AS stats
-                    FROM
-                    (
-                        SELECT {temp_aggregation}.id, {group_column_name}, round(({statistics_column_query})::numeric, 6) AS stats
-                        FROM {temp_aggregation}, {temp_source}
-                        WHERE ST_Intersects({temp_aggregation}.geom, {temp_source}.geom)
-                        AND {temp_aggregation}.h3_3 = {temp_source}.h3_3
-                        GROUP BY {temp_aggregation}.id, {group_by_columns}
-                    ) AS to_group
-                    GROUP BY id
-                """
-                await self.async_session.execute(text(sql_query_group_stats))
-                await self.async_session.execute(
-                    f"CREATE INDEX ON {self.table_name_grouped_stats} (id);"
-                )
-
-                # Build combined query with two left joins
-                sql_query_combine = f"""
-                    INSERT INTO {self.result_table} (layer_id, {insert_columns})
-                    WITH first_join AS
-                    (
-                        SELECT t.id, t.stats AS total_stats, g.stats AS grouped_stats
-                        FROM {self.table_name_grouped_stats} g, {self.table_name_total_stats} t
-                        WHERE g.id = t.id
-                    )
-                    SELECT '{layer_in.id}', {select_columns}, f.total_stats, f.grouped_stats
-                    FROM {aggregation_layer_project.table_name}
-                    LEFT JOIN first_join f
-                    ON {aggregation_layer_project.table_name}.id = f.id
-                    WHERE {aggregation_layer_project.where_query}
-                """
-            else:
-                # Build combined query with one left join
-                sql_query_combine = f"""
-                    INSERT INTO {self.result_table} (layer_id, {insert_columns})
-                    SELECT '{layer_in.id}', {select_columns}, t.stats AS total_stats
-                    FROM {aggregation_layer_project.table_name}
-                    LEFT JOIN {self.table_name_total_stats} t
-                    ON {aggregation_layer_project.table_name}.id = t.id
-                    WHERE {aggregation_layer_project.where_query}
-                """
         else:
             # Get average edge length of h3 grid
-            avg_edge_length = await self.async_session.execute(
-                f"SELECT h3_get_hexagon_edge_length_avg({params.h3_resolution}, 'm')"
-            )
-            avg_edge_length = avg_edge_length.scalars().first()
+            avg_edge_length = h3_avg_edge_lengths.get(params.h3_resolution)
+            if avg_edge_length is None:
+                avg_edge_length = await self.async_session.execute(
+                    f"SELECT h3_get_hexagon_edge_length_avg({params.h3_resolution}, 'm')"
+                )
+                avg_edge_length = avg_edge_length.scalars().first()
+                h3_avg_edge_lengths[params.h3_resolution] = avg_edge_length
 
             # Build group by fields
             group_by_columns_subquery = ""
             if params.source_group_by_field:
-                group_by_columns.replace(f"{temp_source}.", "")
                 group_by_columns_subquery = group_by_columns.replace(
                     f"{temp_source}.", "p."
                 )
@@ -461,7 +474,7 @@ class CRUDAggregatePolygon(CRUDAggregateBase):
             # Build statistics column query
             if params.weigthed_by_intersecting_area:
                 first_statistic_column_query = """* SUM(
-                    (CASE WHEN ST_WITHIN(j.geom, p.geom) THEN 1
+                    (CASE WHEN ST_CoveredBy(j.geom, p.geom) THEN 1
                     WHEN ST_Intersects(j.geom, p.geom) THEN ST_AREA(ST_Intersection(j.geom, p.geom)) / ST_AREA(j.geom)
                     ELSE 0
                     END))
@@ -496,7 +509,7 @@ class CRUDAggregatePolygon(CRUDAggregateBase):
             )
 
             sql_query_pre_grouped = f"""
-                CREATE TABLE {self.table_name_pre_grouped} AS
+                CREATE UNLOGGED TABLE {self.table_name_pre_grouped} AS
                 SELECT h3_target, {group_column_name_with_comma}
                 (ARRAY_AGG({statistics_val}))[1] {first_statistic_column_query} AS val
                 FROM (
@@ -506,18 +519,13 @@ class CRUDAggregatePolygon(CRUDAggregateBase):
                 ) p
                 LEFT JOIN LATERAL (
                     SELECT h3_target, ST_SETSRID(h3_cell_to_boundary(h3_target)::geometry, 4326) AS geom
-                    FROM
-                    (
-                        SELECT CASE WHEN h3_polygon_to_cells IS NULL
-                        THEN h3_lat_lng_to_cell(ST_CENTROID(p.buffer_geom)::point, {params.h3_resolution})
-                        ELSE h3_polygon_to_cells
-                        END AS h3_target
-                        FROM
+                    FROM UNNEST(COALESCE(
                         (
-                            SELECT h3_polygon_to_cells
+                            SELECT ARRAY_AGG(h3_polygon_to_cells)
                             FROM h3_polygon_to_cells(p.buffer_geom::polygon, ARRAY[]::polygon[], {params.h3_resolution})
-                        ) x
-                    ) y
+                        ),
+                        ARRAY[h3_lat_lng_to_cell(ST_CENTROID(p.buffer_geom)::point, {params.h3_resolution})]
+                    )) AS h3_target
                 ) j ON TRUE
                 WHERE ST_Intersects(j.geom, p.geom)
                 GROUP BY h3_target, {group_by_columns_subquery_with_comma} p.id;
@@ -529,20 +537,23 @@ class CRUDAggregatePolygon(CRUDAggregateBase):
 
             # Compute total stats
             sql_query_total_stats = f"""
-                CREATE TABLE {self.table_name_total_stats} AS
+                CREATE UNLOGGED TABLE {self.table_name_total_stats} AS
                 SELECT h3_target::text, ROUND({statistics_sql}::numeric, 6) AS stats
                 FROM {self.table_name_pre_grouped}
                 GROUP BY h3_target;
             """
-            await self.async_session.execute(sql_query_total_stats)
-            await self.async_session.execute(
-                f"CREATE INDEX ON {self.table_name_total_stats} (h3_target);"
-            )
+            # Total and grouped stats don't depend on each other
+            stats_queries = [
+                [
+                    sql_query_total_stats,
+                    f"CREATE INDEX ON {self.table_name_total_stats} (h3_target);",
+                ]
+            ]
 
             if params.source_group_by_field:
                 # Compute grouped stats
                 sql_query_group_stats = f"""
-                    CREATE TABLE {self.table_name_grouped_stats} AS
+                    CREATE UNLOGGED TABLE {self.table_name_grouped_stats} AS
                     SELECT h3_target, JSONB_OBJECT_AGG(group_column_name, stats) AS stats
                     FROM
                     (
@@ -552,9 +563,11 @@ class CRUDAggregatePolygon(CRUDAggregateBase):
                     ) AS to_group
                     GROUP BY h3_target;
                 """
-                await self.async_session.execute(text(sql_query_group_stats))
-                await self.async_session.execute(
-                    f"CREATE INDEX ON {self.table_name_grouped_stats} (h3_target);"
+                stats_queries.append(
+                    [
+                        text(sql_query_group_stats),
+                        f"CREATE INDEX ON {self.table_name_grouped_stats} (h3_target);",
+                    ]
                 )
 
                 sql_query_combine = f"""
@@ -573,6 +586,7 @@ class CRUDAggregatePolygon(CRUDAggregateBase):
                 """
 
         # Execute combined query
+        await self.execute_concurrently(stats_queries)
         await self.async_session.execute(sql_query_combine)
 
         # Create new layer
@@ -645,7 +659,8 @@ class CRUDOriginDestination(CRUDToolBase):
             origin_destination_matrix_layer_project.attribute_mapping,
             params.weight_column,
         )
-        if mapped_weight_column.split("_")[0] not in [
+        weight_type = mapped_weight_column.partition("_")[0]
+        if weight_type not in [
             OgrPostgresType.Integer,
             OgrPostgresType.Real,
             OgrPostgresType.Integer64,
@@ -659,16 +674,17 @@ class CRUDOriginDestination(CRUDToolBase):
             name=DefaultResultLayerName[params.tool_type + "_point"].value,
             feature_layer_geometry_type=FeatureGeometryType.point,
             attribute_mapping={
-                mapped_weight_column.split("_")[0] + "_attr1": "weight",
+                weight_type + "_attr1": "weight",
             },
             tool_type=params.tool_type,
             job_id=self.job_id,
         )
 
         # Build attribute mapping for relation table
+        unique_id_type = mapped_unique_id_column.partition("_")[0]
         attribute_mapping_relation = {
-            mapped_unique_id_column.split("_")[0] + "_attr1": "origin",
-            mapped_unique_id_column.split("_")[0] + "_attr2": "destination",
+            unique_id_type + "_attr1": "origin",
+            unique_id_type + "_attr2": "destination",
         }
         attribute_mapping_relation = assign_attribute(
             mapped_weight_column, attribute_mapping_relation, "weight"
@@ -689,55 +705,59 @@ class CRUDOriginDestination(CRUDToolBase):
         temp_geometry_layer = await self.create_temp_table_layer(
             layer_project=geometry_layer_project,
         )
+        # Index the text key the centroids are deduplicated and joined on
         await self.async_session.execute(
-            f"CREATE INDEX ON {temp_geometry_layer} ({mapped_unique_id_column});"
+            f"CREATE INDEX ON {temp_geometry_layer} (({mapped_unique_id_column}::text));"
         )
+        await self.async_session.execute(f"ANALYZE {temp_geometry_layer};")
         await self.async_session.commit()
 
         # Create temp table for origin destination matrix
         temp_origin_destination_matrix_layer = await self.create_temp_table_layer(
             layer_project=origin_destination_matrix_layer_project,
         )
+        # Collect statistics so the planner does not guess on the fresh temp tables
         await self.async_session.execute(
-            f"CREATE INDEX ON {temp_origin_destination_matrix_layer} ({mapped_origin_column}, {mapped_destination_column});"
+            f"ANALYZE {temp_origin_destination_matrix_layer};"
         )
         await self.async_session.commit()
 
-        # Compute relations
-        select_columns = [
-            "matrix." + attr
-            for attr in list(result_layer_relation.attribute_mapping.keys())
-        ]
-        select_columns = ", ".join(select_columns)
-        sql_query_relations = f"""
-            INSERT INTO {self.result_table_relation} (layer_id, geom, {', '.join(list(result_layer_relation.attribute_mapping.keys()))})
-            SELECT '{result_layer_relation.id}',
-            ST_MakeLine(ST_CENTROID((ARRAY_AGG(origin.geom))[1]), ST_CENTROID((ARRAY_AGG(destination.geom))[1])),
-            (ARRAY_AGG(matrix.{mapped_origin_column}))[1] AS origin, (ARRAY_AGG(matrix.{mapped_destination_column}))[1] AS destination,
-            SUM(matrix.{mapped_weight_column}) AS weight,
-            ST_LENGTH(ST_MakeLine(ST_CENTROID((ARRAY_AGG(origin.geom))[1]), ST_CENTROID((ARRAY_AGG(destination.geom))[1]))::geography) AS length_m
-            FROM {temp_geometry_layer} origin, {temp_geometry_layer} destination, {temp_origin_destination_matrix_layer} matrix
-            WHERE origin.{mapped_unique_id_column}::text = matrix.{mapped_origin_column}::text
-            AND destination.{mapped_unique_id_column}::text = matrix.{mapped_destination_column}::text
-            GROUP BY matrix.{mapped_origin_column}, matrix.{mapped_destination_column}
-        """
-        await self.async_session.execute(sql_query_relations)
-
-        # Compute points
-        sql_query_points = f"""
-            INSERT INTO {self.result_table_point} (layer_id, geom, {', '.join(list(result_layer_point.attribute_mapping.keys()))})
-            WITH grouped AS
+        # Aggregate the matrix once and derive relations and points from it
+        sql_query_origin_destination = f"""
+            WITH matrix AS
+            (
+                SELECT {mapped_origin_column} AS origin, {mapped_destination_column} AS destination,
+                SUM({mapped_weight_column}) AS weight
+                FROM {temp_origin_destination_matrix_layer}
+                GROUP BY {mapped_origin_column}, {mapped_destination_column}
+            ),
+            centroids AS
+            (
+                SELECT DISTINCT ON ({mapped_unique_id_column}::text) {mapped_unique_id_column}::text AS id, ST_CENTROID(geom) AS geom
+                FROM {temp_geometry_layer}
+            ),
+            relations AS
             (
-                SELECT '{result_layer_point.id}', g.{mapped_unique_id_column}, SUM(m.{mapped_weight_column}) AS weight
-                FROM {temp_geometry_layer} g, {temp_origin_destination_matrix_layer} m
-                WHERE g.{mapped_unique_id_column}::text = m.{mapped_destination_column}::text
-                GROUP BY g.{mapped_unique_id_column}
+                INSERT INTO {self.result_table_relation} (layer_id, geom, {', '.join(list(result_layer_relation.attribute_mapping.keys()))})
+                SELECT '{result_layer_relation.id}', ST_MakeLine(origin.geom, destination.geom),
+                matrix.origin, matrix.destination, matrix.weight,
+                ST_LENGTH(ST_MakeLine(origin.geom, destination.geom)::geography) AS length_m
+                FROM matrix
+                JOIN centroids origin ON origin.id = matrix.origin::text
+                JOIN centroids destination ON destination.id = matrix.destination::text
+            ),
+            grouped AS
+            (
+                SELECT destination::text AS id, SUM(weight) AS weight
+                FROM matrix
+                GROUP BY destination::text
             )
-            SELECT '{result_layer_point.id}', ST_CENTROID(g.geom), gg.weight
-            FROM {temp_geometry_layer} g, grouped gg
-            WHERE g.{mapped_unique_id_column}::text = gg.{mapped_unique_id_column}::text
+            INSERT INTO {self.result_table_point} (layer_id, geom, {', '.join(list(result_layer_point.attribute_mapping.keys()))})
+            SELECT '{result_layer_point.id}', c.geom, g.weight
+            FROM grouped g
+            JOIN centroids c ON c.id = g.id
         """
-        await self.async_session.execute(sql_query_points)
+        await self.async_session.execute(sql_query_origin_destination)
 
         # Create new layer
         await self.create_feature_layer_tool(
@@ -25,29 +25,29 @@ class CRUDHeatmapBase(CRUDToolBase):
             | IHeatmapConnectivityMotorized
         ),
     ):
-        # Iterate over opportunity layers supplied by user
-        opportunity_layers = []
-        for layer in params.opportunities:
-            # Get project for this layer
-            input_layer_types = params.input_layer_types
-            layer_project = await crud_layer_project.get_internal(
-                async_session=self.async_session,
-                id=layer.opportunity_layer_project_id,
-                project_id=self.project_id,
-                expected_layer_types=input_layer_types[
-                    "opportunity_layer_project_id"
-                ].layer_types,
-                expected_geometry_types=input_layer_types[
-                    "opportunity_layer_project_id"
-                ].feature_layer_geometry_types,
-            )
+        # Get all opportunity layers supplied by user at once
+        input_layer_types = params.input_layer_types
+        layers_project = await crud_layer_project.get_internal_multi(
+            async_session=self.async_session,
+            ids=[layer.opportunity_layer_project_id for layer in params.opportunities],
+            project_id=self.project_id,
+            expected_layer_types=input_layer_types[
+                "opportunity_layer_project_id"
+            ].layer_types,
+            expected_geometry_types=input_layer_types[
+                "opportunity_layer_project_id"
+            ].feature_layer_geometry_types,
+        )
 
-            # Check Max feature count
-            await self.check_max_feature_cnt(
-                layers_project=[layer_project],
-                tool_type=params.tool_type,
-            )
+        # Check Max feature count
+        await self.check_max_feature_cnt(
+            layers_project=list(layers_project.values()),
+            tool_type=params.tool_type,
+        )
 
+        opportunity_layers = []
+        for layer in params.opportunities:
+            layer_project = layers_project[layer.opportunity_layer_project_id]
             opportunity_layers.append(
                 {
                     "table_name": layer_project.table_name,
@@ -1,23 +1,29 @@
 # Standard library imports
 import asyncio
-import json
 import os
+import time
 from datetime import datetime
+from typing import Dict
 from uuid import UUID, uuid4
 
 # Third party imports
+import aiofiles
+import aiofiles.os as aos
+import orjson
 from fastapi import HTTPException, status
 from fastapi_pagination import Page
 from fastapi_pagination import Params as PaginationParams
 from geoalchemy2.shape import WKTElement
 from pydantic import BaseModel
+from pydantic.json import pydantic_encoder
 from sqlalchemy import and_, func, or_, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
 from sqlmodel import SQLModel
 from starlette.datastructures import UploadFile
 
 # Local application imports
-from src.core.config import settings
+from src.core.config import get_s3_client, settings
 from src.core.content import build_shared_with_object, create_query_shared_content
 from src.core.job import CRUDFailedJob, job_init, job_log, run_background_or_immediately
 from src.core.layer import (
@@ -76,6 +82,26 @@ from src.utils import (
     build_where_clause,
 )
 
+# Statistics only read the layer's table and attribute mapping, not its styling or extent
+layer_stats_load_options = (
+    defer(Layer.properties),
+    defer(Layer.other_properties),
+    defer(Layer.extent),
+)
+
+# Checked stats columns mapped to their expiry and the resolved table, attribute
+# mapping, column and filter. Only plain values are cached, never ORM instances, and
+# the TTL is short as other workers don't see the invalidation on layer changes.
+COLUMN_STATS_CHECK_TTL = 5
+column_stats_checks: Dict[tuple, tuple] = {}
+
+
+def clear_column_stats_checks(layer_id: UUID):
+    """Drop the cached stats column checks of a changed or deleted layer."""
+
+    for key in [key for key in column_stats_checks if key[0] == layer_id]:
+        del column_stats_checks[key]
+
 
 class CRUDLayer(CRUDLayerBase):
     """CRUD class for Layer."""
@@ -93,7 +119,7 @@ class CRUDLayer(CRUDLayerBase):
                     ELSE FALSE
                 END AS cluster_keep
                 FROM {layer.table_name}
-                WHERE layer_id = '{str(layer.id)}'
+                WHERE layer_id = :layer_id
                 ORDER BY h3_group, ST_DISTANCE(ST_CENTROID(geom), ST_SETSRID(h3_cell_to_lat_lng(h3_lat_lng_to_cell(ST_CENTROID(geom)::point, 8))::geometry, 4326))
             )
             UPDATE {layer.table_name} p
@@ -102,13 +128,18 @@ class CRUDLayer(CRUDLayerBase):
             WHERE p.id = u.id
             AND u.cluster_keep IS TRUE"""
 
-            await async_session.execute(text(sql_query))
+            await async_session.execute(text(sql_query), {"layer_id": layer.id})
             await async_session.commit()
 
-    async def get_internal(self, async_session: AsyncSession, id: UUID):
+    async def get_internal(
+        self, async_session: AsyncSession, id: UUID, options: tuple = ()
+    ):
         """Gets a layer and make sure it is a internal layer."""
 
-        layer = await self.get(async_session, id=id)
+        result = await async_session.execute(
+            select(Layer).options(*options).where(Layer.id == id)
+        )
+        layer = result.scalars().first()
         if layer is None:
             raise LayerNotFoundError("Layer not found")
         if layer.type not in [LayerType.feature, LayerType.table]:
@@ -141,6 +172,7 @@ class CRUDLayer(CRUDLayerBase):
         layer = await CRUDBase(Layer).update(
             async_session, db_obj=layer, obj_in=layer_in
         )
+        clear_column_stats_checks(layer.id)
 
         return layer
 
@@ -163,6 +195,7 @@ class CRUDLayer(CRUDLayerBase):
             db=async_session,
             id=id,
         )
+        clear_column_stats_checks(layer.id)
 
         # Delete layer thumbnail
         if (
@@ -170,7 +203,8 @@ class CRUDLayer(CRUDLayerBase):
             and settings.THUMBNAIL_DIR_LAYER in layer.thumbnail_url
             and settings.TEST_MODE is False
         ):
-            settings.S3_CLIENT.delete_object(
+            await asyncio.to_thread(
+                get_s3_client().delete_object,
                 Bucket=settings.AWS_S3_ASSETS_BUCKET,
                 Key=layer.thumbnail_url.replace(settings.ASSETS_URL + "/", ""),
             )
@@ -249,14 +283,11 @@ class CRUDLayer(CRUDLayerBase):
                 detail=validation_result["msg"],
             )
 
-        # Get file size in bytes
-        if isinstance(source, UploadFile):
-            original_position = source.file.tell()
-            source.file.seek(0, 2)
-            file_size = source.file.tell()
-            source.file.seek(original_position)
+        # Get file size in bytes, uploads already know it from the multipart parser
+        if isinstance(source, UploadFile) and source.size is not None:
+            file_size = source.size
         else:
-            file_size = os.path.getsize(file_path)
+            file_size = await aos.path.getsize(file_path)
 
         # Define metadata object
         metadata = IFileUploadMetadata(
@@ -273,9 +304,8 @@ class CRUDLayer(CRUDLayerBase):
         metadata_path = os.path.join(
             os.path.dirname(metadata.file_path), "metadata.json"
         )
-        with open(metadata_path, "w") as f:
-            # Convert dict to json
-            json.dump(metadata.json(), f)
+        async with aiofiles.open(metadata_path, "wb") as f:
+            await f.write(orjson.dumps(metadata.dict(), default=pydantic_encoder))
 
         # Add layer_type and file_size to validation_result
         return metadata
@@ -289,34 +319,52 @@ class CRUDLayer(CRUDLayerBase):
         sql_query = f"""
             SELECT SUM(pg_column_size(p.*))
             FROM {layer.table_name} AS p
-            WHERE layer_id = '{str(layer.id)}'
+            WHERE layer_id = :layer_id
         """
-        result = await async_session.execute(text(sql_query))
+        result = await async_session.execute(
+            text(sql_query), {"layer_id": layer.id}
+        )
         result = result.fetchall()
         return result[0][0]
 
-    async def get_feature_layer_extent(
+    async def get_feature_layer_size_extent(
         self, async_session: AsyncSession, layer: BaseModel | SQLModel
     ):
-        """Get extent of feature layer."""
+        """Get size and extent of feature layer in one scan."""
 
-        # Get extent
+        # Get size and extent
         sql_query = f"""
-            SELECT CASE WHEN ST_MULTI(ST_ENVELOPE(ST_Extent(geom))) <> 'ST_MultiPolygon'
-            THEN ST_MULTI(ST_ENVELOPE(ST_Extent(ST_BUFFER(geom, 0.00001))))
-            ELSE ST_MULTI(ST_ENVELOPE(ST_Extent(geom))) END AS extent
-            FROM {layer.table_name}
-            WHERE layer_id = '{str(layer.id)}'
+            SELECT SUM(pg_column_size(p.*)),
+            ST_MULTI(ST_ENVELOPE(ST_EXPAND(ST_Extent(geom), 0.00001))) AS extent
+            FROM {layer.table_name} AS p
+            WHERE layer_id = :layer_id
         """
-        result = await async_session.execute(text(sql_query))
+        result = await async_session.execute(
+            text(sql_query), {"layer_id": layer.id}
+        )
         result = result.fetchall()
-        return result[0][0]
+        return result[0][0], result[0][1]
 
     async def check_if_column_suitable_for_stats(
         self, async_session: AsyncSession, id: UUID, column_name: str, query: str
     ):
+        # Reuse recent checks as dashboards repeatedly request the same column
+        key = (id, column_name, query)
+        now = time.monotonic()
+        cached = column_stats_checks.get(key)
+        if cached is not None and cached[0] > now:
+            _, table_name, attribute_mapping, column_mapped, where_query = cached
+            return {
+                "table_name": table_name,
+                "attribute_mapping": dict(attribute_mapping),
+                "column_mapped": column_mapped,
+                "where_query": where_query,
+            }
+
         # Check if layer is internal layer
-        layer = await self.get_internal(async_session, id=id)
+        layer = await self.get_internal(
+            async_session, id=id, options=layer_stats_load_options
+        )
         column_mapped = next(
             (
                 key
@@ -329,15 +377,30 @@ class CRUDLayer(CRUDLayerBase):
         if column_mapped is None:
             raise ColumnNotFoundError("Column not found")
 
+        where_query = build_where(
+            id=layer.id,
+            table_name=layer.table_name,
+            query=query,
+            attribute_mapping=layer.attribute_mapping,
+        )
+        if len(column_stats_checks) >= 1000:
+            # Drop expired entries to keep the cache bounded
+            for cached_key, cached in list(column_stats_checks.items()):
+                if cached[0] <= now:
+                    del column_stats_checks[cached_key]
+        column_stats_checks[key] = (
+            now + COLUMN_STATS_CHECK_TTL,
+            layer.table_name,
+            dict(layer.attribute_mapping),
+            column_mapped,
+            where_query,
+        )
+
         return {
-            "layer": layer,
+            "table_name": layer.table_name,
+            "attribute_mapping": dict(layer.attribute_mapping),
             "column_mapped": column_mapped,
-            "where_query": build_where(
-                id=layer.id,
-                table_name=layer.table_name,
-                query=query,
-                attribute_mapping=layer.attribute_mapping,
-            ),
+            "where_query": where_query,
         }
 
     async def get_unique_values(
@@ -353,49 +416,48 @@ class CRUDLayer(CRUDLayerBase):
         res_check = await self.check_if_column_suitable_for_stats(
             async_session=async_session, id=id, column_name=column_name, query=query
         )
-        layer = res_check["layer"]
+        table_name = res_check["table_name"]
         column_mapped = res_check["column_mapped"]
         where_query = res_check["where_query"]
         # Map order
         order_mapped = {"descendent": "DESC", "ascendent": "ASC"}[order]
 
-        # Build count query
-        count_query = f"""
-            SELECT COUNT(*) AS total_count
-            FROM (
-                SELECT {column_mapped}
-                FROM {layer.table_name}
-                WHERE {where_query}
-                AND {column_mapped} IS NOT NULL
-                GROUP BY {column_mapped}
-            ) AS subquery
-        """
-
-        # Execute count query
-        count_result = await async_session.execute(text(count_query))
-        total_results = count_result.scalar_one()
-
-        # Build data query
+        # Build data query, the window counts all groups before the page is cut
         data_query = f"""
-        SELECT *
-        FROM (
-
             SELECT JSONB_BUILD_OBJECT(
                 'value', {column_mapped}, 'count', COUNT(*)
-            )
-            FROM {layer.table_name}
+            ), COUNT(*) OVER () AS total_count
+            FROM {table_name}
             WHERE {where_query}
             AND {column_mapped} IS NOT NULL
             GROUP BY {column_mapped}
             ORDER BY COUNT(*) {order_mapped}, {column_mapped}
-        ) AS subquery
-        LIMIT {page_params.size}
-        OFFSET {(page_params.page - 1) * page_params.size}
+            LIMIT :limit
+            OFFSET :offset
         """
 
         # Execute data query
-        data_result = await async_session.execute(text(data_query))
+        data_result = await async_session.execute(
+            text(data_query),
+            {
+                "limit": page_params.size,
+                "offset": (page_params.page - 1) * page_params.size,
+            },
+        )
         result = data_result.fetchall()
+        if result:
+            total_results = result[0][1]
+        elif page_params.page > 1:
+            # Page is beyond the last group, count the groups separately
+            count_query = f"""
+                SELECT COUNT(DISTINCT {column_mapped}) AS total_count
+                FROM {table_name}
+                WHERE {where_query}
+            """
+            count_result = await async_session.execute(text(count_query))
+            total_results = count_result.scalar_one()
+        else:
+            total_results = 0
         result = [IUniqueValue(**res[0]) for res in result]
 
         # Create Page object
@@ -416,7 +478,9 @@ class CRUDLayer(CRUDLayerBase):
         query: str,
     ):
         # Check if layer is internal layer
-        layer = await self.get_internal(async_session, id=id)
+        layer = await self.get_internal(
+            async_session, id=id, options=layer_stats_load_options
+        )
 
         # Where query
         where_query = build_where(
@@ -442,11 +506,16 @@ class CRUDLayer(CRUDLayerBase):
         where_query = "WHERE " + where_query
 
         # Call SQL function
-        sql_query = f"""
-            SELECT * FROM basic.area_statistics('{operation.value}', '{layer.table_name}', '{where_query.replace("'", "''")}')
-        """
+        sql_query = text(
+            "SELECT * FROM basic.area_statistics(:operation, :table_name, :where_query)"
+        )
         res = await async_session.execute(
             sql_query,
+            {
+                "operation": operation.value,
+                "table_name": layer.table_name,
+                "where_query": where_query,
+            },
         )
         res = res.fetchall()
         return res[0][0] if res else None
@@ -468,9 +537,8 @@ class CRUDLayer(CRUDLayerBase):
 
         args = res
         where_clause = res["where_query"]
-        args["table_name"] = args["layer"].table_name
-        # del layer from args
-        del args["layer"]
+        # The attribute mapping is not a query argument
+        del args["attribute_mapping"]
 
         # Extend where clause
         column_mapped = res["column_mapped"]
@@ -499,7 +567,7 @@ class CRUDLayer(CRUDLayerBase):
             raise OperationNotSupportedError("Operation not supported")
 
         # Execute the query
-        res = await async_session.execute(sql_query, args)
+        res = await async_session.execute(text(sql_query), args)
         res = res.fetchall()
         return res[0][0] if res else None
 
@@ -509,7 +577,9 @@ class CRUDLayer(CRUDLayerBase):
         """Get last updated at timestamp."""
 
         # Check if layer is internal layer
-        layer = await self.get_internal(async_session, id=id)
+        layer = await self.get_internal(
+            async_session, id=id, options=layer_stats_load_options
+        )
         where_query = build_where(
             id=layer.id,
             table_name=layer.table_name,
@@ -1032,6 +1102,7 @@ class CRUDDataDelete(CRUDFailedJob):
     ):
         for layer in layers:
             await delete_layer_data(async_session=async_session, layer=layer)
+            clear_column_stats_checks(layer.id)
         return {
             "status": JobStatusType.finished.value,
             "msg": "Data was successfuly deleted.",
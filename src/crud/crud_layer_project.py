@@ -7,6 +7,7 @@ from fastapi import HTTPException, status
 from pydantic import BaseModel, ValidationError, parse_obj_as
 from sqlalchemy import select, text, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
 from sqlmodel import SQLModel
 
 from src.core.layer import CRUDLayerBase
@@ -19,11 +20,17 @@ from src.schemas.project import (
     layer_type_mapping_read,
     layer_type_mapping_update,
 )
-from src.utils import build_where_clause
 
 # Local application imports
 from .base import CRUDBase
 
+# The styling of a layer is copied into the layer project on creation and the layer
+# project values always take precedence, so the layer's JSONB blobs are not loaded.
+layer_project_load_options = (
+    defer(Layer.properties),
+    defer(Layer.other_properties),
+)
+
 
 class CRUDLayerProject(CRUDLayerBase):
     async def layer_projects_to_schemas(
@@ -50,17 +57,24 @@ class CRUDLayerProject(CRUDLayerBase):
             layer_dict.update(layer_project.dict())
             layer_project = layer_type_mapping_read[layer_type](**layer_dict)
 
-            # Get feature cnt for all feature layers and tables
-            if layer_project.type in [LayerType.feature.value, LayerType.table.value]:
-                feature_cnt = await self.get_feature_cnt(
-                    async_session=async_session, layer_project=layer_project
-                )
-                layer_project.total_count = feature_cnt["total_count"]
-                layer_project.filtered_count = feature_cnt.get("filtered_count")
-
             # Write into correct schema
             layer_projects_schemas.append(layer_project)
 
+        # Get feature cnt for all feature layers and tables at once
+        layers_project_cnt = [
+            layer_project
+            for layer_project in layer_projects_schemas
+            if layer_project.type in [LayerType.feature.value, LayerType.table.value]
+        ]
+        feature_cnts = await self.get_feature_cnt_multi(
+            async_session=async_session, layers_project=layers_project_cnt
+        )
+        for layer_project, feature_cnt in zip(
+            layers_project_cnt, feature_cnts, strict=True
+        ):
+            layer_project.total_count = feature_cnt["total_count"]
+            layer_project.filtered_count = feature_cnt.get("filtered_count")
+
         return layer_projects_schemas
 
     async def get_layers(
@@ -71,9 +85,13 @@ class CRUDLayerProject(CRUDLayerBase):
         """Get all layers from a project"""
 
         # Get all layers from project
-        query = select([Layer, LayerProjectLink]).where(
-            LayerProjectLink.project_id == project_id,
-            Layer.id == LayerProjectLink.layer_id,
+        query = (
+            select([Layer, LayerProjectLink])
+            .options(*layer_project_load_options)
+            .where(
+                LayerProjectLink.project_id == project_id,
+                Layer.id == LayerProjectLink.layer_id,
+            )
         )
 
         # Get all layers from project
@@ -90,9 +108,13 @@ class CRUDLayerProject(CRUDLayerBase):
         """Get all layer projects links by the ids"""
 
         # Get all layers from project by id
-        query = select([Layer, LayerProjectLink]).where(
-            LayerProjectLink.id.in_(ids),
-            Layer.id == LayerProjectLink.layer_id,
+        query = (
+            select([Layer, LayerProjectLink])
+            .options(*layer_project_load_options)
+            .where(
+                LayerProjectLink.id.in_(ids),
+                Layer.id == LayerProjectLink.layer_id,
+            )
         )
 
         # Get all layers from project
@@ -117,42 +139,71 @@ class CRUDLayerProject(CRUDLayerBase):
     ):
         """Get internal layer from layer project"""
 
-        # Get layer project
-        query = select([Layer, LayerProjectLink]).where(
-            LayerProjectLink.id == id,
-            Layer.id == LayerProjectLink.layer_id,
-            LayerProjectLink.project_id == project_id,
+        layers_project = await self.get_internal_multi(
+            async_session=async_session,
+            ids=[id],
+            project_id=project_id,
+            expected_layer_types=expected_layer_types,
+            expected_geometry_types=expected_geometry_types,
         )
-        layer_project = await self.get_multi(
+        return layers_project[id]
+
+    async def get_internal_multi(
+        self,
+        async_session: AsyncSession,
+        ids: List[int],
+        project_id: UUID,
+        expected_layer_types: List[Union[LayerType.feature, LayerType.table]] = [
+            LayerType.feature
+        ],
+        expected_geometry_types: List[FeatureGeometryType] = None,
+    ):
+        """Get internal layers from layer projects with one query, keyed by layer project id"""
+
+        # Get layer projects
+        query = (
+            select([Layer, LayerProjectLink])
+            .options(*layer_project_load_options)
+            .where(
+                LayerProjectLink.id.in_(ids),
+                Layer.id == LayerProjectLink.layer_id,
+                LayerProjectLink.project_id == project_id,
+            )
+        )
+        layers_project = await self.get_multi(
             db=async_session,
             query=query,
         )
-        layer_project = await self.layer_projects_to_schemas(
-            async_session, layer_project
+        layers_project = await self.layer_projects_to_schemas(
+            async_session, layers_project
         )
+        layers_project = {
+            layer_project.id: layer_project for layer_project in layers_project
+        }
 
-        # Make sure layer project exists
-        if layer_project == []:
+        # Make sure all layer projects exist
+        if not set(ids).issubset(layers_project):
             raise LayerNotFoundError("Layer project not found")
-        layer_project = layer_project[0]
-        # Check if one of the expected layer types is given
-        if layer_project.type not in expected_layer_types:
-            raise UnsupportedLayerTypeError(
-                f"Layer {layer_project.name} is not a {[layer_type.value for layer_type in expected_layer_types]} layer"
-            )
 
-        # Check if geometry type is correct
-        if layer_project.type == LayerType.feature.value:
-            if expected_geometry_types is not None:
-                if (
-                    layer_project.feature_layer_geometry_type
-                    not in expected_geometry_types
-                ):
-                    raise UnsupportedLayerTypeError(
-                        f"Layer {layer_project.name} is not a {[geom_type.value for geom_type in expected_geometry_types]} layer"
-                    )
+        for layer_project in layers_project.values():
+            # Check if one of the expected layer types is given
+            if layer_project.type not in expected_layer_types:
+                raise UnsupportedLayerTypeError(
+                    f"Layer {layer_project.name} is not a {[layer_type.value for layer_type in expected_layer_types]} layer"
+                )
 
-        return layer_project
+            # Check if geometry type is correct
+            if layer_project.type == LayerType.feature.value:
+                if expected_geometry_types is not None:
+                    if (
+                        layer_project.feature_layer_geometry_type
+                        not in expected_geometry_types
+                    ):
+                        raise UnsupportedLayerTypeError(
+                            f"Layer {layer_project.name} is not a {[geom_type.value for geom_type in expected_geometry_types]} layer"
+                        )
+
+        return layers_project
 
     async def create(
         self,
@@ -315,24 +366,54 @@ class CRUDLayerProject(CRUDLayerBase):
     ):
         """Get feature count for a layer or a layer project."""
 
-        # Get feature count total
+        # Get feature count total and filtered in one scan
         feature_cnt = {}
         table_name = layer_project.table_name
-        sql_query = f"SELECT COUNT(*) FROM {table_name} WHERE layer_id = '{str(layer_project.layer_id)}'"
-        result = await async_session.execute(text(sql_query))
-        feature_cnt["total_count"] = result.scalar_one()
-
-        # Get feature count filtered
         if not where_query:
-            where_query = build_where_clause([layer_project.where_query])
-        else:
-            where_query = build_where_clause([where_query])
+            where_query = layer_project.where_query
+        filtered_count_query = (
+            f", COUNT(*) FILTER (WHERE {where_query})" if where_query else ""
+        )
+        sql_query = f"SELECT COUNT(*){filtered_count_query} FROM {table_name} WHERE layer_id = :layer_id"
+        result = await async_session.execute(
+            text(sql_query), {"layer_id": layer_project.layer_id}
+        )
+        result = result.fetchone()
+        feature_cnt["total_count"] = result[0]
         if where_query:
-            sql_query = f"SELECT COUNT(*) FROM {table_name} {where_query}"
-            result = await async_session.execute(text(sql_query))
-            feature_cnt["filtered_count"] = result.scalar_one()
+            feature_cnt["filtered_count"] = result[1]
         return feature_cnt
 
+    async def get_feature_cnt_multi(
+        self,
+        async_session: AsyncSession,
+        layers_project: List[SQLModel | BaseModel],
+    ):
+        """Get feature counts for several layer projects with one query."""
+
+        if not layers_project:
+            return []
+
+        # Count every layer project in its own branch of a UNION ALL
+        sql_queries = []
+        params = {}
+        for i, layer_project in enumerate(layers_project):
+            sql_queries.append(
+                f"SELECT {i} AS idx, COUNT(*), COUNT(*) FILTER (WHERE {layer_project.where_query}) FROM {layer_project.table_name} WHERE layer_id = :layer_id_{i}"
+            )
+            params[f"layer_id_{i}"] = layer_project.layer_id
+        result = await async_session.execute(
+            text(" UNION ALL ".join(sql_queries)), params
+        )
+        rows = {row[0]: row for row in result.fetchall()}
+
+        feature_cnts = []
+        for i in range(len(layers_project)):
+            feature_cnts.append(
+                {"total_count": rows[i][1], "filtered_count": rows[i][2]}
+            )
+        return feature_cnts
+
     async def check_exceed_feature_cnt(
         self,
         async_session: AsyncSession,
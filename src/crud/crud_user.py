@@ -15,13 +15,28 @@ class CRUDUser(CRUDBase):
     async def create_user_data_tables(self, async_session: AsyncSession, user_id: UUID):
         """Create the user data tables."""
         # Don't create the network table for all users yet
-        for table_type in (UserDataTable.point, UserDataTable.line, UserDataTable.polygon, UserDataTable.no_geometry):
+        table_types = (UserDataTable.point, UserDataTable.line, UserDataTable.polygon, UserDataTable.no_geometry)
+
+        # Check which tables exist already with one query
+        result = await async_session.execute(
+            text(
+                """SELECT tablename::text FROM pg_tables
+                WHERE schemaname = :schema_name AND tablename::text = ANY(CAST(:table_names AS text[]))"""
+            ),
+            {
+                "schema_name": settings.USER_DATA_SCHEMA,
+                "table_names": [f"{table_type.value}_{str(user_id).replace('-', '')}" for table_type in table_types],
+            },
+        )
+        existing_tables = set(result.scalars().all())
+
+        # Collect all statements to run them in a single DO block
+        sql_statements = []
+        for table_type in table_types:
             table_name = f"{table_type.value}_{str(user_id).replace('-', '')}"
 
             # Check if table exists
-            if not await table_exists(
-                async_session, settings.USER_DATA_SCHEMA, table_name
-            ):
+            if table_name not in existing_tables:
                 # Create table
                 if table_type.value == UserDataTable.no_geometry.value:
                     geom_column = ""
@@ -70,7 +85,7 @@ class CRUDUser(CRUDBase):
                     {additional_columns}
                 );
                 """
-                await async_session.execute(text(sql_create_table))
+                sql_statements.append(sql_create_table)
 
                 # Apply indices for standard spatial tables
                 if table_type in (
@@ -83,29 +98,21 @@ class CRUDUser(CRUDBase):
                         BEFORE INSERT OR UPDATE ON {settings.USER_DATA_SCHEMA}."{table_name}"
                         FOR EACH ROW EXECUTE FUNCTION basic.set_user_data_h3();
                     """
-                    await async_session.execute(text(sql_create_trigger))
+                    sql_statements.append(sql_create_trigger)
                     # Create Geospatial Index
-                    await async_session.execute(
-                        text(
-                            f"""CREATE INDEX ON {settings.USER_DATA_SCHEMA}."{table_name}" USING GIST(layer_id, geom);"""
-                        )
+                    sql_statements.append(
+                        f"""CREATE INDEX ON {settings.USER_DATA_SCHEMA}."{table_name}" USING GIST(layer_id, geom);"""
                     )
                     # Create index for clustering
-                    await async_session.execute(
-                        text(
-                            f"""CREATE INDEX ON {settings.USER_DATA_SCHEMA}."{table_name}" (layer_id, h3_group);"""
-                        )
+                    sql_statements.append(
+                        f"""CREATE INDEX ON {settings.USER_DATA_SCHEMA}."{table_name}" (layer_id, h3_group);"""
                     )
-                    await async_session.execute(
-                        text(
-                            f"""CREATE INDEX ON {settings.USER_DATA_SCHEMA}."{table_name}" (layer_id, cluster_keep);"""
-                        )
+                    sql_statements.append(
+                        f"""CREATE INDEX ON {settings.USER_DATA_SCHEMA}."{table_name}" (layer_id, cluster_keep);"""
                     )
                     # Create Primary Key on ID
-                    await async_session.execute(
-                        text(
-                            f"""ALTER TABLE {settings.USER_DATA_SCHEMA}."{table_name}" ADD PRIMARY KEY(id);"""
-                        )
+                    sql_statements.append(
+                        f"""ALTER TABLE {settings.USER_DATA_SCHEMA}."{table_name}" ADD PRIMARY KEY(id);"""
                     )
                 # Create Index for street_segment and street_connector
                 elif table_type in [
@@ -113,57 +120,50 @@ class CRUDUser(CRUDBase):
                     UserDataTable.street_network_line.value,
                 ]:
                     # Create Geospatial Index
-                    await async_session.execute(
-                        text(
-                            f"""CREATE INDEX ON {settings.USER_DATA_SCHEMA}."{table_name}" USING GIST(h3_3, layer_id, geom);"""
-                        )
+                    sql_statements.append(
+                        f"""CREATE INDEX ON {settings.USER_DATA_SCHEMA}."{table_name}" USING GIST(h3_3, layer_id, geom);"""
                     )
                     # Create index for source and target
                     if table_type == UserDataTable.street_network_line.value:
-                        await async_session.execute(
-                            text(
-                                f"""CREATE INDEX ON {settings.USER_DATA_SCHEMA}."{table_name}" (h3_3, layer_id, source);"""
-                            )
+                        sql_statements.append(
+                            f"""CREATE INDEX ON {settings.USER_DATA_SCHEMA}."{table_name}" (h3_3, layer_id, source);"""
                         )
-                        await async_session.execute(
-                            text(
-                                f"""CREATE INDEX ON {settings.USER_DATA_SCHEMA}."{table_name}" (h3_3, layer_id, target);"""
-                            )
+                        sql_statements.append(
+                            f"""CREATE INDEX ON {settings.USER_DATA_SCHEMA}."{table_name}" (h3_3, layer_id, target);"""
                         )
                     if table_type == UserDataTable.street_network_point.value:
-                        await async_session.execute(
-                            text(
-                                f"""CREATE INDEX ON {settings.USER_DATA_SCHEMA}."{table_name}" (h3_3, layer_id, connector_id);"""
-                            )
+                        sql_statements.append(
+                            f"""CREATE INDEX ON {settings.USER_DATA_SCHEMA}."{table_name}" (h3_3, layer_id, connector_id);"""
                         )
                     # Create Index on ID
-                    await async_session.execute(
-                        text(
-                            f"""CREATE INDEX ON {settings.USER_DATA_SCHEMA}."{table_name}" (h3_3, id);"""
-                        )
+                    sql_statements.append(
+                        f"""CREATE INDEX ON {settings.USER_DATA_SCHEMA}."{table_name}" (h3_3, id);"""
                     )
                     # Make table distributed in case of street_segment and street_connector
-                    await async_session.execute(
-                        text(
-                            f"""SELECT create_distributed_table('{settings.USER_DATA_SCHEMA}.{table_name}', 'h3_3');"""
-                        )
+                    sql_statements.append(
+                        f"""PERFORM create_distributed_table('{settings.USER_DATA_SCHEMA}.{table_name}', 'h3_3');"""
                     )
                 elif table_type == UserDataTable.no_geometry.value:
                     # Create index on layer_id
-                    await async_session.execute(
-                        text(
-                            f"""CREATE INDEX ON {settings.USER_DATA_SCHEMA}."{table_name}" (layer_id);"""
-                        )
+                    sql_statements.append(
+                        f"""CREATE INDEX ON {settings.USER_DATA_SCHEMA}."{table_name}" (layer_id);"""
                     )
                     # Create Primary Key on ID
-                    await async_session.execute(
-                        text(
-                            f"""ALTER TABLE {settings.USER_DATA_SCHEMA}."{table_name}" ADD PRIMARY KEY(id);"""
-                        )
+                    sql_statements.append(
+                        f"""ALTER TABLE {settings.USER_DATA_SCHEMA}."{table_name}" ADD PRIMARY KEY(id);"""
                     )
             else:
                 print(f"Table '{table_name}' already exists.")
 
+        if sql_statements:
+            # Creates all tables, triggers and indexes in one roundtrip and transaction
+            sql_statements = [
+                statement.strip().rstrip(";") + ";" for statement in sql_statements
+            ]
+            await async_session.execute(
+                text("DO $$ BEGIN\n" + "\n".join(sql_statements) + "\nEND $$;")
+            )
+
         # Commit changes
         await async_session.commit()
 
@@ -45,6 +45,7 @@ class LayerProjectLink(DateTimeBase, table=True):
         sa_column=Column(
             UUID_PG(as_uuid=True),
             ForeignKey(f"{settings.CUSTOMER_SCHEMA}.layer.id", ondelete="CASCADE"),
+            index=True,
         ),
         description="Layer ID",
     )
@@ -52,6 +53,7 @@ class LayerProjectLink(DateTimeBase, table=True):
         sa_column=Column(
             UUID_PG(as_uuid=True),
             ForeignKey(f"{settings.CUSTOMER_SCHEMA}.project.id", ondelete="CASCADE"),
+            index=True,
         ),
         description="Project ID",
     )
@@ -88,9 +90,6 @@ class ScenarioScenarioFeatureLink(DateTimeBase, table=True):
     __tablename__ = "scenario_scenario_feature"
     __table_args__ = {"schema": settings.CUSTOMER_SCHEMA}
 
-    id: int | None = Field(
-        sa_column=Column(Integer, primary_key=True, autoincrement=True)
-    )
     scenario_id: UUID | None = Field(
         sa_column=Column(
             UUID_PG(as_uuid=True),
@@ -108,6 +107,7 @@ class ScenarioScenarioFeatureLink(DateTimeBase, table=True):
             ),
             primary_key=True,
             nullable=False,
+            index=True,
         ),
         description="Scenario Feature ID",
     )
@@ -27,6 +27,7 @@ class Folder(DateTimeBase, table=True):
             UUID_PG(as_uuid=True),
             ForeignKey(f"{settings.ACCOUNTS_SCHEMA}.user.id", ondelete="CASCADE"),
             nullable=False,
+            index=True,
         ),
         description="Folder owner ID",
     )
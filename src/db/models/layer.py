@@ -4,9 +4,9 @@ from uuid import UUID
 
 import pycountry
 from geoalchemy2 import Geometry, WKBElement
-from geoalchemy2.shape import to_shape
 from pydantic import BaseModel, EmailStr, HttpUrl, validator
-from sqlalchemy import text
+from shapely import from_wkb
+from sqlalchemy import Index, text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.dialects.postgresql import UUID as UUID_PG
 from sqlmodel import (
@@ -176,6 +176,14 @@ class DataCategory(str, Enum):
     places = "places"
 
 
+def wkb_to_wkt(v: WKBElement) -> str:
+    """Convert a WKB element to WKT with shapely's C parser."""
+
+    # The element holds hex for extended WKB and raw bytes otherwise
+    data = v.data if isinstance(v.data, str) else bytes(v.data)
+    return from_wkb(data).wkt
+
+
 class GeospatialAttributes(SQLModel):
     """Some general geospatial attributes."""
 
@@ -190,7 +198,7 @@ class GeospatialAttributes(SQLModel):
     @validator("extent", pre=True)
     def wkt_to_geojson(cls, v):
         if v and isinstance(v, WKBElement):
-            return to_shape(v).wkt
+            return wkb_to_wkt(v)
         else:
             return v
 
@@ -334,19 +342,26 @@ layer_base_example = {
 def internal_layer_table_name(values: SQLModel | BaseModel):
     """Get the table name for the internal layer."""
 
-    # Get table name
-    if values.type == LayerType.feature.value:
+    # Get table name, LayerType is a str enum and compares equal to plain values
+    if values.type == LayerType.feature:
         # If of type enum return value
         if isinstance(values.feature_layer_geometry_type, Enum):
             feature_layer_geometry_type = values.feature_layer_geometry_type.value
         else:
             feature_layer_geometry_type = values.feature_layer_geometry_type
-    elif values.type == LayerType.table.value:
+    elif values.type == LayerType.table:
         feature_layer_geometry_type = "no_geometry"
     else:
         raise ValueError(f"The passed layer type {values.type} is not supported.")
 
-    return f"{settings.USER_DATA_SCHEMA}.{feature_layer_geometry_type}_{str(values.user_id).replace('-', '')}"
+    # UUID exposes the dash-less form directly
+    user_id = values.user_id
+    if isinstance(user_id, UUID):
+        user_id = user_id.hex
+    else:
+        user_id = str(user_id).replace("-", "")
+
+    return f"{settings.USER_DATA_SCHEMA}.{feature_layer_geometry_type}_{user_id}"
 
 
 class Layer(LayerBase, GeospatialAttributes, DateTimeBase, table=True):
@@ -377,6 +392,7 @@ class Layer(LayerBase, GeospatialAttributes, DateTimeBase, table=True):
             UUID_PG(as_uuid=True),
             ForeignKey(f"{settings.CUSTOMER_SCHEMA}.folder.id", ondelete="CASCADE"),
             nullable=False,
+            index=True,
         ),
         description="Layer folder ID",
     )
@@ -387,6 +403,7 @@ class Layer(LayerBase, GeospatialAttributes, DateTimeBase, table=True):
         sa_column=Column(
             UUID_PG(as_uuid=True),
             ForeignKey(f"{settings.CUSTOMER_SCHEMA}.data_store.id"),
+            index=True,
         ),
         description="Data store ID of the layer",
     )
@@ -461,7 +478,7 @@ class Layer(LayerBase, GeospatialAttributes, DateTimeBase, table=True):
     @validator("extent", pre=True)
     def wkt_to_geojson(cls, v):
         if v and isinstance(v, WKBElement):
-            return to_shape(v).wkt
+            return wkb_to_wkt(v)
         else:
             return v
 
@@ -476,4 +493,16 @@ class Layer(LayerBase, GeospatialAttributes, DateTimeBase, table=True):
 
 # Constraints
 UniqueConstraint(Layer.__table__.c.folder_id, Layer.__table__.c.name)
+
+# Indexes for the layer listings filtered by owner or catalog and layer type
+Index(
+    "ix_customer_layer_user_id_type",
+    Layer.__table__.c.user_id,
+    Layer.__table__.c.type,
+)
+Index(
+    "ix_customer_layer_catalog_type",
+    Layer.__table__.c.type,
+    postgresql_where=Layer.__table__.c.in_catalog,
+)
 Layer.update_forward_refs()
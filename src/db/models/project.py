@@ -50,6 +50,7 @@ class Project(ContentBaseAttributes, DateTimeBase, table=True):
             UUID_PG(as_uuid=True),
             ForeignKey(f"{settings.ACCOUNTS_SCHEMA}.user.id", ondelete="CASCADE"),
             nullable=False,
+            index=True,
         ),
         description="Project owner ID",
     )
@@ -58,6 +59,7 @@ class Project(ContentBaseAttributes, DateTimeBase, table=True):
             UUID_PG(as_uuid=True),
             ForeignKey(f"{settings.CUSTOMER_SCHEMA}.folder.id", ondelete="CASCADE"),
             nullable=False,
+            index=True,
         ),
         description="Project folder ID",
     )
@@ -45,6 +45,7 @@ class Scenario(DateTimeBase, table=True):
             UUID_PG(as_uuid=True),
             ForeignKey(f"{settings.ACCOUNTS_SCHEMA}.user.id", ondelete="CASCADE"),
             nullable=False,
+            index=True,
         ),
     )
 
@@ -10,6 +10,7 @@ from sqlalchemy.ext.asyncio import (
 )
 from sqlalchemy import event
 import asyncpg
+import orjson
 
 
 async def set_type_codec(
@@ -111,6 +112,11 @@ async def setup(conn):
     )
 
 
+def json_serializer(obj) -> str:
+    # orjson returns bytes, the asyncpg dialect expects a str for JSON/JSONB
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
 class DatabaseSessionManager:
     def __init__(self):
         self._engine: AsyncEngine | None = None
@@ -120,7 +126,21 @@ class DatabaseSessionManager:
         self._engine = create_async_engine(
             host,
             isolation_level="AUTOCOMMIT",
-            connect_args={"server_settings": {"application_name": "GOAT Core"}},
+            # Keep enough warm connections for the background jobs and their
+            # concurrent queries, so checkouts rarely need a new connection.
+            pool_size=20,
+            max_overflow=10,
+            # Encode and decode the JSON/JSONB columns with orjson
+            json_serializer=json_serializer,
+            json_deserializer=orjson.loads,
+            connect_args={
+                # JIT compilation adds latency to the PostGIS queries without
+                # paying off, and a larger statement cache avoids re-preparing
+                # the frequently executed queries.
+                "server_settings": {"application_name": "GOAT Core", "jit": "off"},
+                "prepared_statement_cache_size": 500,
+                "statement_cache_size": 500,
+            },
         )
         self._session_maker = sessionmaker(
             bind=self._engine,
@@ -2,7 +2,7 @@ DROP FUNCTION IF EXISTS basic.heads_and_tails_breaks;
 CREATE OR REPLACE FUNCTION basic.heads_and_tails_breaks(table_name text, column_name text, where_filter TEXT, breaks INT)
 RETURNS JSONB AS $$
 DECLARE 
-    arr_mean float;
+    heads float[];
     reply float[] := ARRAY[]::float[];
     min_val float;
     max_val float;
@@ -20,11 +20,17 @@ BEGIN
     -- Append initial break
     reply := array_append(reply, current_break);
 
+    -- Fetch the head above the mean once, every further break only looks at a shrinking part of it.
+    -- Without further breaks or without values there is no head to fetch.
+    IF breaks > 1 AND current_break IS NOT NULL THEN
+        EXECUTE format('SELECT ARRAY_AGG(%I::float) FROM %s WHERE %I::float > %s AND %s', 
+                       column_name, table_name, column_name, current_break, where_filter)
+                       INTO heads;
+    END IF;
+
     -- Iteratively calculate the average of elements greater than the last average
     WHILE i < breaks LOOP
-        EXECUTE format('SELECT AVG(%I::float) FROM %s WHERE %I::float > %s AND %s', 
-                       column_name, table_name, column_name, current_break, where_filter)
-                       INTO current_break;
+        SELECT AVG(h) INTO current_break FROM UNNEST(heads) h;
 
         -- Break loop if no more distinct values
         IF current_break IS NULL THEN
@@ -38,6 +44,7 @@ BEGIN
         -- Append the break and increment
         reply := array_append(reply, current_break);
         i := i + 1;
+        heads := ARRAY(SELECT h FROM UNNEST(heads) h WHERE h > current_break);
     END LOOP;
 
     result := jsonb_build_object('mean', mean_val, 'min', min_val, 'max', max_val, 'breaks', reply);
@@ -31,6 +31,7 @@ from src.core.content import (
 from src.crud.crud_job import job as crud_job
 from src.crud.crud_layer import CRUDLayerDatasetUpdate, CRUDLayerExport, CRUDLayerImport
 from src.crud.crud_layer import layer as crud_layer
+from src.crud.crud_layer import layer_stats_load_options
 from src.crud.crud_layer_project import layer_project as crud_layer_project
 from src.db.models.layer import (
     FeatureUploadType,
@@ -176,7 +177,10 @@ def _validate_and_fetch_metadata(
         )
 
     with open(os.path.join(metadata_path)) as f:
-        file_metadata = json.loads(json.load(f))
+        file_metadata = json.load(f)
+    # Metadata files of older uploads contain the JSON encoded as a string
+    if isinstance(file_metadata, str):
+        file_metadata = json.loads(file_metadata)
 
     return file_metadata
 
@@ -626,6 +630,7 @@ async def get_feature_count(
         layer = await crud_layer.get_internal(
             async_session=async_session,
             id=layer_id,
+            options=layer_stats_load_options,
         )
         where_query = build_where(
             layer.id, layer.table_name, query, layer.attribute_mapping
@@ -35,10 +35,10 @@ async def read_system_settings(
         async_session, keys={"user_id": user_id}
     )
     if not system_settings or len(system_settings) == 0:
-        default_system_settings_obj_in = SystemSettingsCreate(
-            **default_system_settings.dict()
+        # The defaults are already validated, copy them without re-validation
+        default_system_settings_obj_in = default_system_settings.copy(
+            update={"user_id": user_id}
         )
-        default_system_settings_obj_in.user_id = user_id
         system_settings = await crud_system_setting.create(
             async_session, obj_in=default_system_settings_obj_in
         )
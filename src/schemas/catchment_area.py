@@ -9,8 +9,8 @@ from src.schemas.layer import ToolType
 from src.schemas.toolbox_base import (
     CatchmentAreaStartingPointsBase,
     DefaultResultLayerName,
+    GeofenceTable,
     PTTimeWindow,
-    check_starting_points,
     input_layer_type_line,
     input_layer_type_point,
 )
@@ -22,14 +22,14 @@ class CatchmentAreaStartingPointsActiveMobility(CatchmentAreaStartingPointsBase)
     """Model for the active mobility catchment area starting points."""
 
     # Check that the starting points for active mobility are below 1000
-    check_starting_points = check_starting_points(1000)
+    MAX_STARTING_POINTS = 1000
 
 
 class CatchmentAreaStartingPointsMotorizedMobility(CatchmentAreaStartingPointsBase):
     """Model for the active mobility catchment area starting points."""
 
     # Check that the starting points for motorized mobility is 1
-    check_starting_points = check_starting_points(1)
+    MAX_STARTING_POINTS = 1
 
 
 """Catchment area routing mode schemas."""
@@ -340,10 +340,7 @@ class ICatchmentAreaActiveMobility(BaseModel):
 
     @property
     def geofence_table(self):
-        mode = ToolType.catchment_area_active_mobility.value.replace(
-            "catchment_area_", ""
-        )
-        return f"basic.geofence_{mode}"
+        return GeofenceTable.catchment_area_active_mobility.value
 
     @property
     def input_layer_types(self):
@@ -449,8 +446,7 @@ class ICatchmentAreaPT(BaseModel):
 
     @property
     def geofence_table(self):
-        mode = ToolType.catchment_area_pt.value.replace("catchment_area_", "")
-        return f"basic.geofence_{mode}"
+        return GeofenceTable.catchment_area_pt.value
 
     @property
     def input_layer_types(self):
@@ -539,10 +535,7 @@ class ICatchmentAreaCar(BaseModel):
 
     @property
     def geofence_table(self):
-        mode = ToolType.catchment_area_active_mobility.value.replace(
-            "catchment_area_", ""
-        )
-        return f"basic.geofence_{mode}"
+        return GeofenceTable.catchment_area_car.value
 
     @property
     def input_layer_types(self):
@@ -637,8 +630,7 @@ class CatchmentAreaNearbyStationAccess(BaseModel):
 
     @property
     def geofence_table(self):
-        mode = ToolType.catchment_area_pt.value.replace("catchment_area_", "")
-        return f"basic.geofence_{mode}"
+        return GeofenceTable.catchment_area_pt.value
 
     @property
     def input_layer_types(self):
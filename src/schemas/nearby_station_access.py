@@ -12,7 +12,6 @@ from src.schemas.layer import ToolType
 from src.schemas.toolbox_base import (
     CatchmentAreaStartingPointsBase,
     PTTimeWindow,
-    check_starting_points,
     input_layer_type_line,
     input_layer_type_point,
 )
@@ -21,7 +20,7 @@ from src.schemas.toolbox_base import (
 class IStartingPointNearbyStationAccess(CatchmentAreaStartingPointsBase):
     """Model for the starting points of the nearby station endpoint."""
 
-    check_starting_points = check_starting_points(1000)
+    MAX_STARTING_POINTS = 1000
 
 
 class INearbyStationAccess(BaseModel):
@@ -1,6 +1,6 @@
 # Standard Libraries
 from enum import Enum
-from typing import List
+from typing import ClassVar, List
 from uuid import UUID
 
 from fastapi import BackgroundTasks, Depends, Query
@@ -132,6 +132,9 @@ class IToolResponse(BaseModel):
 class CatchmentAreaStartingPointsBase(BaseModel):
     """Base model for catchment area attributes."""
 
+    # Maximum number of starting points, set by the subclasses
+    MAX_STARTING_POINTS: ClassVar[int | None] = None
+
     latitude: List[float] | None = Field(
         None,
         title="Latitude",
@@ -161,14 +164,19 @@ class CatchmentAreaStartingPointsBase(BaseModel):
                 )
             if len(lat) != len(long):
                 raise ValueError("Latitude and longitude must have the same length.")
+            if (
+                cls.MAX_STARTING_POINTS is not None
+                and len(lat) > cls.MAX_STARTING_POINTS
+            ):
+                raise ValueError(
+                    f"The maximum number of starting points is {cls.MAX_STARTING_POINTS}."
+                )
 
             # Check if lat/lon are within WGS84 bounds
-            for lat_val in lat:
-                if lat_val < -90 or lat_val > 90:
-                    raise ValueError("Latitude must be between -90 and 90.")
-            for lon_val in long:
-                if lon_val < -180 or lon_val > 180:
-                    raise ValueError("Longitude must be between -180 and 180.")
+            if min(lat) < -90 or max(lat) > 90:
+                raise ValueError("Latitude must be between -90 and 90.")
+            if min(long) < -180 or max(long) > 180:
+                raise ValueError("Longitude must be between -180 and 180.")
 
         if not (lat and long) and not layer_project_id:
             raise ValueError(
@@ -178,26 +186,6 @@ class CatchmentAreaStartingPointsBase(BaseModel):
         return values
 
 
-def check_starting_points(max_count):
-    @root_validator(pre=True, allow_reuse=True)
-    def _validator(cls, values):
-        lat = values.get("latitude")
-        long = values.get("longitude")
-
-        if lat and long:
-            if len(lat) > max_count:
-                raise ValueError(
-                    f"The maximum number of starting points is {max_count}."
-                )
-            if len(long) > max_count:
-                raise ValueError(
-                    f"The maximum number of starting points is {max_count}."
-                )
-        return values
-
-    return _validator
-
-
 class PTSupportedDay(str, Enum):
     """PT supported days schema."""
 
@@ -248,6 +236,9 @@ class PTTimeWindow(BaseModel):
 
 
 class CommonToolParams:
+    # Created per request, slots avoid allocating an instance dict
+    __slots__ = ("background_tasks", "async_session", "user_id", "project_id")
+
     def __init__(
         self,
         background_tasks: BackgroundTasks,
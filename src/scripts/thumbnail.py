@@ -1,12 +1,11 @@
 import asyncio
 from datetime import datetime, timezone
-from uuid import uuid4
 
 from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 from utils import fetch_last_run_timestamp, update_last_run_timestamp
 
-from src.core.config import settings
+from src.core.config import get_s3_client, settings
 from src.core.print import PrintMap
 from src.crud.base import CRUDBase
 from src.crud.crud_layer_project import layer_project as crud_layer_project
@@ -86,7 +85,7 @@ async def process_projects(async_session: AsyncSession, last_run: datetime):
                         old_thumbnail_url
                         and settings.THUMBNAIL_DIR_PROJECT in old_thumbnail_url
                     ):
-                        settings.S3_CLIENT.delete_object(
+                        get_s3_client().delete_object(
                             Bucket=settings.AWS_S3_ASSETS_BUCKET,
                             Key=old_thumbnail_url.replace(
                                 settings.ASSETS_URL + "/", ""
@@ -100,54 +99,49 @@ async def process_layers(async_session: AsyncSession, last_run: datetime):
     """Update thumbnails of layers."""
 
     # Process all layers requiring a thumbnail update
-    layers = await fetch_layers_to_update(async_session, last_run)
-
-    if len(layers) > 0:
-        for layer in layers:
-            try:
-                layer = layer[0]
-                if layer.type in (LayerType.feature, LayerType.table, LayerType.raster):
-                    # If there is a feature_layer_type and it is street_network then skip the layer
-                    if (
-                        layer.feature_layer_type
-                        and layer.feature_layer_type == FeatureType.street_network
-                    ):
-                        continue
-
-                    print(f"Updating thumbnail for layer: {layer.id}")
-
-                    old_thumbnail_url = layer.thumbnail_url
-
-                    # Create thumbnail
-                    print_map = PrintMap(async_session)
-                    thumbnail_url = await print_map.create_layer_thumbnail(
-                        layer=layer,
-                        file_name=str(layer.id) + "_" + str(uuid4()) + ".png",
-                    )
-
-                    # Update layer with thumbnail url bypassing the model to avoid the table getting a new updated at
-                    await async_session.execute(
-                        text(
-                            """UPDATE customer.layer
-                                SET thumbnail_url = :thumbnail_url WHERE id = :id""",
-                        ),
-                        {"thumbnail_url": thumbnail_url, "id": layer.id},
-                    )
-                    await async_session.commit()
-
-                    # Delete old thumbnail from s3 if the thumbnail is not the default thumbnail
-                    if (
-                        old_thumbnail_url
-                        and settings.THUMBNAIL_DIR_LAYER in old_thumbnail_url
-                    ):
-                        settings.S3_CLIENT.delete_object(
-                            Bucket=settings.AWS_S3_ASSETS_BUCKET,
-                            Key=old_thumbnail_url.replace(
-                                settings.ASSETS_URL + "/", ""
-                            ),
-                        )
-            except Exception as e:
-                print(f"Error updating layer thumbnail: {e}")
+    layers = [
+        layer[0]
+        for layer in await fetch_layers_to_update(async_session, last_run)
+        if layer[0].type in (LayerType.feature, LayerType.table, LayerType.raster)
+        # If there is a feature_layer_type and it is street_network then skip the layer
+        and layer[0].feature_layer_type != FeatureType.street_network
+    ]
+
+    # Create thumbnails
+    print_map = PrintMap(async_session)
+    thumbnail_urls = await print_map.create_layer_thumbnails(layers)
+
+    for layer, thumbnail_url in zip(layers, thumbnail_urls, strict=True):
+        try:
+            if isinstance(thumbnail_url, Exception):
+                raise thumbnail_url
+
+            print(f"Updating thumbnail for layer: {layer.id}")
+
+            old_thumbnail_url = layer.thumbnail_url
+
+            # Update layer with thumbnail url bypassing the model to avoid the table getting a new updated at
+            await async_session.execute(
+                text(
+                    """UPDATE customer.layer
+                        SET thumbnail_url = :thumbnail_url WHERE id = :id""",
+                ),
+                {"thumbnail_url": thumbnail_url, "id": layer.id},
+            )
+            await async_session.commit()
+
+            # Delete old thumbnail from s3 if the thumbnail is not the default thumbnail
+            if (
+                old_thumbnail_url
+                and old_thumbnail_url != thumbnail_url
+                and settings.THUMBNAIL_DIR_LAYER in old_thumbnail_url
+            ):
+                get_s3_client().delete_object(
+                    Bucket=settings.AWS_S3_ASSETS_BUCKET,
+                    Key=old_thumbnail_url.replace(settings.ASSETS_URL + "/", ""),
+                )
+        except Exception as e:
+            print(f"Error updating layer thumbnail: {e}")
 
 
 async def main():
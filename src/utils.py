@@ -509,25 +509,35 @@ def build_insert_query(
 
 
 async def async_get_with_retry(
-    url: str, headers: dict, num_retries: int, retry_delay: int
+    url: str,
+    headers: dict,
+    num_retries: int,
+    retry_delay: int,
+    session: aiohttp.ClientSession = None,
 ):
-    async with aiohttp.ClientSession() as session:
-        for i in range(num_retries):
-            async with session.get(url, headers=headers) as response:
-                if response.status != 200:
-                    # Server is still processing request, retry shortly
-                    if i == num_retries - 1:
-                        raise Exception(
-                            "GEOAPI-Server took too long to process request. It can be that the layer is not properly processed yet."
-                        )
-                    await asyncio.sleep(retry_delay)
-                    continue
-                elif response.status == 200:
-                    # Server has finished processing request, break
-                    result = await response.text()
-                    return result
-                else:
-                    raise Exception(await response.text())
+    # Reuse the connections of the passed session if there is one
+    if session is None:
+        async with aiohttp.ClientSession() as session:
+            return await async_get_with_retry(
+                url, headers, num_retries, retry_delay, session=session
+            )
+
+    for i in range(num_retries):
+        async with session.get(url, headers=headers) as response:
+            if response.status != 200:
+                # Server is still processing request, retry shortly
+                if i == num_retries - 1:
+                    raise Exception(
+                        "GEOAPI-Server took too long to process request. It can be that the layer is not properly processed yet."
+                    )
+                await asyncio.sleep(retry_delay)
+                continue
+            elif response.status == 200:
+                # Server has finished processing request, break
+                result = await response.text()
+                return result
+            else:
+                raise Exception(await response.text())
 
 
 def hex_to_rgb(hex: str) -> tuple:
@@ -4,8 +4,11 @@ from uuid import uuid4
 
 import pytest
 from httpx import AsyncClient
+from PIL import Image
 
 from src.core.config import settings
+from src.core.print import PrintMap
+from src.crud.crud_layer import layer as crud_layer
 from src.db.models.layer import LayerType
 from src.schemas.layer import (
     AreaStatisticsOperation,
@@ -316,6 +319,38 @@ async def test_get_unique_values_layer_pagination(
     return
 
 
+@pytest.mark.asyncio
+async def test_get_unique_values_layer_pagination_total(
+    client: AsyncClient, fixture_create_feature_layer
+):
+    layer_id = fixture_create_feature_layer["id"]
+    column = "name"
+
+    # The total counts all unique values and not only the ones on the page
+    response = await client.get(
+        f"{settings.API_V2_STR}/layer/{layer_id}/unique-values/{column}?page=1&size=5"
+    )
+    assert response.status_code == 200
+    total = response.json()["total"]
+    assert total > 5
+
+    response = await client.get(
+        f"{settings.API_V2_STR}/layer/{layer_id}/unique-values/{column}?page=2&size=5"
+    )
+    assert response.status_code == 200
+    assert response.json()["total"] == total
+
+    # Request a page beyond the last unique value
+    response = await client.get(
+        f"{settings.API_V2_STR}/layer/{layer_id}/unique-values/{column}?page=1000&size=5"
+    )
+    assert response.status_code == 200
+    assert response.json()["items"] == []
+    assert response.json()["total"] == total
+
+    return
+
+
 @pytest.mark.asyncio
 async def test_get_unique_values_layer_query(
     client: AsyncClient, fixture_create_feature_layer
@@ -473,6 +508,19 @@ async def test_get_statistics_column_wrong_column_name(
     return
 
 
+@pytest.mark.asyncio
+async def test_create_table_thumbnail(fixture_create_table_layer, db_session):
+    layer = await crud_layer.get(db_session, id=fixture_create_table_layer["id"])
+
+    image = await PrintMap(db_session).create_table_thumbnail(layer)
+
+    # Check that a PNG of the thumbnail size was drawn
+    thumbnail = Image.open(image)
+    assert thumbnail.format == "PNG"
+    assert thumbnail.size == (674, 280)
+    return
+
+
 # Get metadata aggregate for layers based on different filters
 async def test_get_layers(client: AsyncClient, fixture_create_multiple_layers):
     response = await client.post(f"{settings.API_V2_STR}/layer")
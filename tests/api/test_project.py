@@ -184,6 +184,43 @@ async def test_get_layers_project(client: AsyncClient, fixture_create_layer_proj
     )
 
 
+@pytest.mark.asyncio
+async def test_get_layers_project_feature_cnt(
+    client: AsyncClient, fixture_create_layer_project
+):
+    project_id = fixture_create_layer_project["project_id"]
+    feature_layer_project_id = fixture_create_layer_project["layer_project"][0]["id"]
+
+    # Filter the feature layer, the other layers are only filtered by their layer id
+    response = await client.put(
+        f"{settings.API_V2_STR}/project/{project_id}/layer/{feature_layer_project_id}",
+        json={
+            "query": {
+                "cql": {"op": "=", "args": [{"property": "category"}, "bus_stop"]}
+            },
+        },
+    )
+    assert response.status_code == 200
+
+    response = await client.get(
+        f"{settings.API_V2_STR}/project/{project_id}/layer",
+    )
+    assert response.status_code == 200
+    layers = {layer["id"]: layer for layer in response.json()}
+    assert len(layers) == 3
+
+    # Feature counts are matched back to the right layer project
+    for layer in layers.values():
+        if layer["id"] == feature_layer_project_id:
+            assert layer["total_count"] == 26
+            assert layer["filtered_count"] == 2
+        elif layer["type"] == "table":
+            assert layer["total_count"] > 0
+            assert layer["filtered_count"] == layer["total_count"]
+        else:
+            assert layer.get("total_count") is None
+
+
 # TODO: Add test for style
 @pytest.mark.asyncio
 async def test_update_layer_project(client: AsyncClient, fixture_create_layer_project):
@@ -4,6 +4,7 @@ from pydantic import ValidationError
 from src.schemas.catchment_area import (
     CatchmentAreaTravelDistanceCostActiveMobility,
     CatchmentAreaStartingPointsActiveMobility,
+    CatchmentAreaStartingPointsMotorizedMobility,
 )
 
 def test_check_starting_points_below_1000():
@@ -35,3 +36,27 @@ def test_distance_step_not_divisible_by_50():
     # Test with a value that is not divisible by 50
     with pytest.raises(ValidationError):
         CatchmentAreaTravelDistanceCostActiveMobility(max_distance=1000, distance_step=45)
+
+def test_check_starting_points_exactly_1000():
+    # Test with the maximum number of starting points
+    try:
+        CatchmentAreaStartingPointsActiveMobility(
+            latitude=[i % 180 - 90 for i in range(1000)],
+            longitude=[i % 360 - 180 for i in range(1000)]
+        )
+    except ValidationError:
+        pytest.fail("ValidationError was raised unexpectedly!")
+
+def test_check_starting_points_motorized_mobility_single_point():
+    # Test that motorized mobility accepts a single starting point
+    try:
+        CatchmentAreaStartingPointsMotorizedMobility(latitude=[0.0], longitude=[0.0])
+    except ValidationError:
+        pytest.fail("ValidationError was raised unexpectedly!")
+
+def test_check_starting_points_motorized_mobility_above_1():
+    # Test that motorized mobility rejects more than one starting point
+    with pytest.raises(ValidationError, match="The maximum number of starting points is 1."):
+        CatchmentAreaStartingPointsMotorizedMobility(
+            latitude=[0.0, 1.0], longitude=[0.0, 1.0]
+        )
@@ -49,3 +49,10 @@ def test_input_layer_type_no_layers():
     # Test that layer_type cannot be none
     with pytest.raises(ValidationError):
         InputLayerType(layer_types=[], feature_layer_geometry_types=None)
+
+def test_catchment_area_starting_points_base_no_max_starting_points():
+    # Test that the base model does not limit the number of starting points
+    CatchmentAreaStartingPointsBase(
+        latitude=[i % 180 - 90 for i in range(1500)],
+        longitude=[i % 360 - 180 for i in range(1500)]
+    )